@@ -0,0 +1,9 @@
+"""NumPy helpers shared by the crawl-wide analyses."""
+import numpy as np
+
+
+def ranges(starts, counts):
+    """Concatenated ``arange(start, start + count)`` for every pair."""
+    total = int(counts.sum())
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(total, dtype=np.int64)
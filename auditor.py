@@ -0,0 +1,428 @@
+"""Automatic answers for the mechanically checkable rubric criteria.
+
+A page is streamed once through ``SignalExtractor`` into ``PageSignals`` (headings, titles, meta tags,
+images, link relations, JSON-LD bodies and, on request, anchors and main text); each check then reads those
+signals and returns ``YES``/``NO``/``NA``, or ``None`` to leave the
+criterion to the auditor. Judgement-based criteria are never answered.
+"""
+import json
+import re
+from html.parser import HTMLParser
+from urllib.parse import unquote, urljoin, urlsplit
+
+from rubric import NA, NO, RUBRIC, YES
+
+H1_LENGTH = (20, 70)
+TITLE_LENGTH = (50, 60)
+DESCRIPTION_LENGTH = (150, 160)
+
+HREFLANG_RE = re.compile(r"^(x-default|[a-z]{2,3}(-[a-z]{4})?(-([a-z]{2}|\d{3}))?)$", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
+CHUNK_SIZE = 64 * 1024
+
+
+class PageSignals:
+    __slots__ = ("headings", "titles", "descriptions", "robots", "images", "canonicals", "alternates", "json_ld",
+                 "base", "links", "text", "main_text")
+
+    def __init__(self):
+        self.headings = []  # (level, text) in document order
+        self.titles = []
+        self.descriptions = []
+        self.robots = []  # content of meta robots/googlebot tags
+        self.images = []  # alt attribute, None when missing
+        self.canonicals = []
+        self.alternates = []  # (hreflang, href)
+        self.json_ld = []
+        self.base = None  # href of the first <base> tag
+        self.links = []  # (href, anchor text); only collected when asked for
+        self.text = []  # body text outside navigation, boilerplate and scripts; only when asked for
+        self.main_text = []  # the part of ``text`` inside <main>/<article>
+
+
+def normalize_text(text):
+    return WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class SignalExtractor(HTMLParser):
+    """Event-driven collector for ``PageSignals``; no document tree is built.
+
+    With ``head_only`` parsing stops at ``</head>`` (or the first body-level
+    tag when the head isn't closed), leaving body signals empty. With
+    ``links`` every ``<a href>`` is recorded with its text (image alt text
+    included) for the crawl graph; with ``text`` the page's body text is
+    collected for near-duplicate detection.
+    """
+
+    HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+    BODY_TAGS = frozenset(("body", "h1", "h2", "h3", "h4", "h5", "h6", "img", "p", "div"))
+    # Elements whose text isn't part of the page's own content
+    BOILERPLATE_TAGS = frozenset(("head", "script", "style", "noscript", "template", "svg", "nav", "header", "footer",
+                                  "aside", "form"))
+    MAIN_TAGS = frozenset(("main", "article"))
+
+    def __init__(self, head_only=False, links=False, text=False):
+        super().__init__(convert_charrefs=True)
+        self.signals = PageSignals()
+        self.head_only = head_only
+        self.links = links
+        self.text = text
+        self._boilerplate_depth = 0
+        self._main_depth = 0
+        self._href = None  # anchor whose text is being collected
+        self._anchor_text = []
+        self._svg_depth = 0
+        self._capture = None  # tag whose text is being collected
+        self._level = 0
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.head_only and tag in self.BODY_TAGS:
+            raise _StopParsing
+        if self.text:
+            if tag in self.BOILERPLATE_TAGS:
+                self._boilerplate_depth += 1
+            elif tag in self.MAIN_TAGS:
+                self._main_depth += 1
+        if tag == "svg":
+            self._svg_depth += 1
+        elif tag in self.HEADINGS:
+            self._finish(self._capture)
+            self._start(tag, self.HEADINGS[tag])
+        elif tag == "title":
+            # <title> inside inline SVG is not the document title
+            if not self._svg_depth:
+                self._start(tag)
+        elif tag == "meta":
+            attrs = dict(attrs)
+            meta_name = (attrs.get("name") or "").lower()
+            if meta_name == "description":
+                self.signals.descriptions.append(normalize_text(attrs.get("content")))
+            elif meta_name in ("robots", "googlebot"):
+                self.signals.robots.append((attrs.get("content") or "").lower())
+        elif tag == "img":
+            alt = dict(attrs).get("alt")
+            self.signals.images.append(alt)
+            if self._href is not None and alt:
+                self._anchor_text.append(f" {alt} ")
+        elif tag == "a":
+            if self.links:
+                self._finish_anchor()
+                href = dict(attrs).get("href")
+                if href:
+                    self._href = href
+        elif tag == "base":
+            if self.signals.base is None:
+                self.signals.base = dict(attrs).get("href")
+        elif tag == "link":
+            attrs = dict(attrs)
+            rel = (attrs.get("rel") or "").lower().split()
+            if "canonical" in rel:
+                self.signals.canonicals.append(attrs.get("href") or "")
+            elif "alternate" in rel and attrs.get("hreflang"):
+                self.signals.alternates.append((attrs["hreflang"], attrs.get("href") or ""))
+        elif tag == "script":
+            if (dict(attrs).get("type") or "").lower() == "application/ld+json":
+                self._start(tag)
+
+    def handle_endtag(self, tag):
+        if self.text:
+            if tag in self.BOILERPLATE_TAGS:
+                self._boilerplate_depth = max(self._boilerplate_depth - 1, 0)
+            elif tag in self.MAIN_TAGS:
+                self._main_depth = max(self._main_depth - 1, 0)
+        if tag == "svg":
+            self._svg_depth = max(self._svg_depth - 1, 0)
+        elif tag == self._capture:
+            self._finish(tag)
+        elif tag == "a":
+            self._finish_anchor()
+        elif tag == "head" and self.head_only:
+            raise _StopParsing
+
+    def handle_data(self, data):
+        if self._capture:
+            self._text.append(data)
+        if self._href is not None:
+            self._anchor_text.append(data)
+        if self.text and not self._boilerplate_depth:
+            self.signals.text.append(data)
+            if self._main_depth:
+                self.signals.main_text.append(data)
+
+    def close(self):
+        super().close()
+        self._finish(self._capture)
+        self._finish_anchor()
+
+    def _finish_anchor(self):
+        if self._href is not None:
+            self.signals.links.append((self._href, normalize_text("".join(self._anchor_text))))
+            self._href = None
+            self._anchor_text = []
+
+    def _start(self, tag, level=0):
+        self._capture = tag
+        self._level = level
+        self._text = []
+
+    def _finish(self, tag):
+        if tag is None:
+            return
+        text = "".join(self._text)
+        if tag == "title":
+            self.signals.titles.append(normalize_text(text))
+        elif tag == "script":
+            self.signals.json_ld.append(text)
+        else:
+            self.signals.headings.append((self._level, normalize_text(text)))
+        self._capture = None
+        self._text = []
+
+
+def extract_signals(source, head_only=False, links=False, text=False):
+    """Stream ``source`` (HTML text or a text file object) through ``SignalExtractor``."""
+    parser = SignalExtractor(head_only, links, text)
+    if isinstance(source, str):
+        chunks = (source[i:i + CHUNK_SIZE] for i in range(0, len(source), CHUNK_SIZE))
+    else:
+        chunks = iter(lambda: source.read(CHUNK_SIZE), "")
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.close()
+    except _StopParsing:
+        pass
+    return parser.signals
+
+
+def main_text(signals):
+    """The page's main content text: <main>/<article> when present, else all non-boilerplate body text."""
+    return normalize_text(" ".join(signals.main_text or signals.text))
+
+
+def _contains(text, keyword):
+    return keyword.lower() in text.lower()
+
+
+def _answer(condition):
+    return YES if condition else NO
+
+
+def _split(url):
+    """``urlsplit`` of a URL, or None when it can't be parsed (e.g. a malformed IPv6 host)."""
+    try:
+        return urlsplit(url)
+    except ValueError:
+        return None
+
+
+def _resolve(url, href):
+    """``href`` resolved against ``url``, or None when either can't be parsed."""
+    try:
+        return urljoin(url, href)
+    except ValueError:
+        return None
+
+
+def _same_url(a, b):
+    a, b = _split(a) if a is not None else None, _split(b) if b is not None else None
+    if a is None or b is None:
+        return False
+    return (a.scheme.lower(), a.netloc.lower(), a.path or "/", a.query) == (b.scheme.lower(), b.netloc.lower(), b.path or "/", b.query)
+
+
+def _h1_first(signals, keyword, url):
+    return _answer(bool(signals.headings) and signals.headings[0][0] == 1)
+
+
+def _h1_length(signals, keyword, url):
+    h1s = [text for level, text in signals.headings if level == 1]
+    return _answer(bool(h1s) and H1_LENGTH[0] <= len(h1s[0]) <= H1_LENGTH[1])
+
+
+def _h1_keyword(signals, keyword, url):
+    if not keyword:
+        return None
+    return _answer(any(_contains(text, keyword) for level, text in signals.headings if level == 1))
+
+
+def _single_h1(signals, keyword, url):
+    return _answer(sum(1 for level, _text in signals.headings if level == 1) == 1)
+
+
+def _title_length(signals, keyword, url):
+    return _answer(bool(signals.titles) and TITLE_LENGTH[0] <= len(signals.titles[0]) <= TITLE_LENGTH[1])
+
+
+def _title_keyword(signals, keyword, url):
+    if not keyword:
+        return None
+    return _answer(bool(signals.titles) and _contains(signals.titles[0], keyword))
+
+
+def _single_title(signals, keyword, url):
+    return _answer(len(signals.titles) == 1)
+
+
+def _description_length(signals, keyword, url):
+    descriptions = signals.descriptions
+    return _answer(bool(descriptions) and DESCRIPTION_LENGTH[0] <= len(descriptions[0]) <= DESCRIPTION_LENGTH[1])
+
+
+def _description_keyword(signals, keyword, url):
+    if not keyword:
+        return None
+    return _answer(bool(signals.descriptions) and _contains(signals.descriptions[0], keyword))
+
+
+def _single_description(signals, keyword, url):
+    return _answer(len(signals.descriptions) == 1)
+
+
+def _heading_hierarchy(signals, keyword, url):
+    levels = [level for level, _text in signals.headings]
+    if not levels or levels[0] != 1 or levels.count(1) != 1:
+        return NO
+    # A heading may go at most one level deeper than the one before it
+    return _answer(all(b - a <= 1 for a, b in zip(levels, levels[1:])))
+
+
+def _image_alt(signals, keyword, url):
+    if not signals.images or not keyword:
+        return None
+    alts = [normalize_text(alt) for alt in signals.images]
+    return _answer(all(alts) and any(_contains(alt, keyword) for alt in alts))
+
+
+def _json_ld(signals, keyword, url):
+    for body in signals.json_ld:
+        try:
+            json.loads(body)
+        except ValueError:
+            continue
+        return YES
+    return NO
+
+
+def _canonical(signals, keyword, url):
+    if not url:
+        return None
+    return _answer(len(signals.canonicals) == 1 and _same_url(_resolve(url, signals.canonicals[0]), url))
+
+
+def _hreflang(signals, keyword, url):
+    if not signals.alternates:
+        return NA
+    codes = [code.lower() for code, _href in signals.alternates]
+    # An href that can't be parsed can't point at a translation
+    if url:
+        resolved = [_resolve(url, href) for _code, href in signals.alternates]
+    else:
+        resolved = [None if _split(href) is None else href for _code, href in signals.alternates]
+    valid = all(HREFLANG_RE.match(code) and href for code, href in signals.alternates) and len(set(codes)) == len(codes)
+    valid = valid and None not in resolved
+    if url:
+        valid = valid and any(_same_url(href, url) for href in resolved)
+    return _answer(valid)
+
+
+def _indexable(signals, keyword, url):
+    # Only a noindex can be decided from the HTML; robots.txt still needs checking
+    for content in signals.robots:
+        directives = {directive.strip() for directive in content.split(",")}
+        if "noindex" in directives or "none" in directives:
+            return NO
+    return None
+
+
+def _slug(url):
+    parts = _split(url) if url else None
+    return unquote(parts.path) if parts is not None else None
+
+
+def _slug_lowercase(signals, keyword, url):
+    slug = _slug(url)
+    return None if slug is None else _answer(slug == slug.lower())
+
+
+def _slug_hyphens(signals, keyword, url):
+    slug = _slug(url)
+    return None if slug is None else _answer("_" not in slug and " " not in slug)
+
+
+def _slug_parameters(signals, keyword, url):
+    parts = _split(url) if url else None
+    return _answer(not parts.query) if parts is not None else None
+
+
+def _slug_ascii(signals, keyword, url):
+    slug = _slug(url)
+    return None if slug is None else _answer(slug.isascii())
+
+
+def _https(signals, keyword, url):
+    parts = _split(url) if url else None
+    return _answer(parts.scheme.lower() == "https") if parts is not None else None
+
+
+CHECKS = {
+    ("H1 Tag", "Is included on-page at top of heading hierarchy"): _h1_first,
+    ("H1 Tag", "Contains proper length"): _h1_length,
+    ("H1 Tag", "Contains primary keyword"): _h1_keyword,
+    ("H1 Tag", "There is only a single H1 tag on-page"): _single_h1,
+    ("Meta Title", "Contains proper length"): _title_length,
+    ("Meta Title", "Contains primary keyword"): _title_keyword,
+    ("Meta Title", "There is only a single meta title on-page"): _single_title,
+    ("Meta Description", "Contains proper length"): _description_length,
+    ("Meta Description", "Contains primary keyword"): _description_keyword,
+    ("Meta Description", "There is only a single meta description on-page"): _single_description,
+    ("Proper Heading Hierarchy", "Only a single H1; H2s follow H1 tag; H3s follow H2s, etc…"): _heading_hierarchy,
+    ("Image Alt Text", "Images include alt text with target keyword"): _image_alt,
+    ("Schema Markup", "Schema is included on-page as JSON-LD"): _json_ld,
+    ("URL Slug", "Lowercase only"): _slug_lowercase,
+    ("URL Slug", "Hyphens only"): _slug_hyphens,
+    ("URL Slug", "Non-parameterized (optional)"): _slug_parameters,
+    ("URL Slug", "ASCII characters only"): _slug_ascii,
+    ("Canonical Tag", "Canonical tag contains self-reference"): _canonical,
+    ("Hreflang Tag", "Hreflang tag (optional) is correct, targets the right locations, and references other translated page equivalents"): _hreflang,
+    ("Indexability", "Page is indexable by search engines / isn't blocked by meta tags or robots.txt"): _indexable,
+    ("HTTPS", "Page is served over HTTPS"): _https,
+}
+
+# Resolve criterion ids once so audits never look up criterion text
+COMPILED_CHECKS = tuple((RUBRIC.criterion_id(factor, criterion), check) for (factor, criterion), check in CHECKS.items())
+
+# Checks that only read <head> signals or the URL itself
+HEAD_CHECKS = frozenset((
+    _title_length, _title_keyword, _single_title,
+    _description_length, _description_keyword, _single_description,
+    _canonical, _hreflang, _indexable,
+    _slug_lowercase, _slug_hyphens, _slug_parameters, _slug_ascii, _https,
+))
+HEAD_CRITERIA = frozenset(c for c, check in COMPILED_CHECKS if check in HEAD_CHECKS)
+
+
+def evaluate(signals, keyword="", url=None, criteria=None):
+    """Map criterion ids to response codes for every criterion the signals decide.
+
+    ``criteria`` restricts evaluation to a set of criterion ids.
+    """
+    keyword = normalize_text(keyword)
+    answers = {}
+    for c, check in COMPILED_CHECKS:
+        if criteria is not None and c not in criteria:
+            continue
+        answer = check(signals, keyword, url)
+        if answer is not None:
+            answers[c] = answer
+    return answers
+
+
+def audit_html(html, keyword="", url=None, criteria=None):
+    head_only = criteria is not None and HEAD_CRITERIA.issuperset(criteria)
+    return evaluate(extract_signals(html, head_only), keyword, url, criteria)
@@ -0,0 +1,75 @@
+"""Startup benchmark for the Streamlit app.
+
+Reports the import time of each module in a fresh interpreter, the time
+to first render of ``main.py`` and which heavy modules that first render
+loaded. Usage::
+
+    python bench_startup.py [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MODULES = ["streamlit", "numpy", "openai", "docx", "tiktoken", "rubric", "scoring", "cache", "recommendations", "auditor"]
+HEAVY_MODULES = ["numpy", "pandas", "openai", "docx", "bs4", "tiktoken", "auditor"]
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+RENDER_SNIPPET = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({path!r}, default_timeout=60)
+start = time.perf_counter()
+app.run()
+elapsed = time.perf_counter() - start
+if app.exception:
+    sys.exit(app.exception[0].message)
+print(elapsed)
+print(",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def _run(snippet):
+    result = subprocess.run([sys.executable, "-c", snippet], cwd=HERE, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return result.stdout.split("\n")
+
+
+def import_time(module, repeat):
+    return statistics.median(float(_run(IMPORT_SNIPPET.format(module=module))[0]) for _ in range(repeat))
+
+
+def first_render(repeat):
+    runs = [_run(RENDER_SNIPPET.format(path=os.path.join(HERE, "main.py"), heavy=HEAVY_MODULES)) for _ in range(repeat)]
+    return statistics.median(float(lines[0]) for lines in runs), runs[-1][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    print(f"{'module':<20}{'import ms':>10}")
+    for module in MODULES:
+        try:
+            print(f"{module:<20}{import_time(module, args.repeat) * 1000:>10.1f}")
+        except RuntimeError as e:
+            print(f"{module:<20}{'n/a':>10}  ({e})")
+
+    elapsed, loaded = first_render(args.repeat)
+    print(f"\nTime to first render: {elapsed * 1000:.1f} ms")
+    print(f"Heavy modules loaded by first render: {loaded or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
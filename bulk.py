@@ -0,0 +1,561 @@
+"""Headless bulk auditing of saved pages.
+
+Pages are streamed out of directories of HTML files and WARC/WARC.gz
+archives, audited with ``auditor.audit_html`` in a process pool and scored
+with the same factor/bucket math as the app. Usage::
+
+    python bulk.py crawl.warc.gz saved_pages/ -o scores.csv --keyword "running shoes"
+
+With ``--recommendations out.jsonl`` GPT recommendations are generated for
+every page concurrently (``OPENAI_API_KEY`` must be set), and with
+``--report portfolio.docx`` every page's report is streamed into one Word
+document; ``--reports-zip reports.zip`` writes one document per page instead.
+``--history`` records every audit in the history store, and ``--fix-list``
+writes each page's minimum-effort fixes to reach ``--fix-target``.
+``--link-graph`` builds the crawl's internal link graph and answers the
+criteria it decides (see ``linkgraph.py``), and ``--duplicates`` finds
+near-duplicate pages competing for the same keyword (see ``duplicates.py``).
+``--sitemap`` answers sitemap inclusion from local sitemap files, and
+``--robots`` checks indexability against robots.txt files (see ``robots.py``).
+``--canonicals`` resolves rel=canonical chains into clusters (see ``canonicals.py``).
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import re
+import sys
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from itertools import islice
+
+import numpy as np
+
+from auditor import evaluate, extract_signals, main_text
+from cache import RecommendationCache, default_cache_path
+from calibration import CalibratedRanking
+from canonicals import CanonicalGraphBuilder, page_canonicals
+from duplicates import DEFAULT_THRESHOLD, MINHASHER, DuplicateIndex
+from fixes import load_efforts, solve_fixes
+from history import HistoryStore, default_history_path
+from linkgraph import LinkGraphBuilder, normalize_url, page_links
+from recommendations import DEFAULT_CONCURRENCY, DEFAULT_RPM, DEFAULT_TOKEN_BUDGET, DEFAULT_TPM, generate_recommendations
+from ranking import RankingTable, estimate_rankings
+from report import PortfolioWriter, export_portfolio, export_reports_zip
+from robots import DEFAULT_AGENT, INDEXABILITY_CRITERION, RobotsIndex, RobotsTxt, combine_indexability, x_robots_directives
+from rubric import NA, NO, RUBRIC
+from scoring import WeightMatrix, score_batch
+from sitemaps import SitemapIndex
+
+HTML_SUFFIXES = (".html", ".htm")
+CHARSET_RE = re.compile(rb"charset=[\"']?([\w-]+)", re.IGNORECASE)
+
+WEIGHTS = WeightMatrix()
+HISTORY_BATCH = 1000
+FIX_LIST_HEADER = ["url", "Overall", "target", "effort", "new_overall", "fixes"]
+SITEMAP_BATCH = 1000
+
+# Set once per worker process by ``_init_worker`` rather than shipped with every chunk
+_worker_robots = None
+
+
+def _decode(body, content_type=b""):
+    match = CHARSET_RE.search(content_type) or CHARSET_RE.search(body[:2048])
+    encoding = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def iter_directory(root, base_url=None):
+    """Yield ``(url, html)`` for every HTML file under ``root``.
+
+    Without ``base_url`` the relative path stands in for the URL and URL-based
+    checks are skipped.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(HTML_SUFFIXES):
+                continue
+            path = os.path.join(dirpath, filename)
+            relative = os.path.relpath(path, root).replace(os.sep, "/")
+            if base_url:
+                if relative == "index.html" or relative.endswith("/index.html"):
+                    relative = relative[:-len("index.html")]
+                url = base_url.rstrip("/") + "/" + relative
+            else:
+                url = relative
+            with open(path, "rb") as f:
+                yield url, _decode(f.read())
+
+
+def _read_headers(stream):
+    headers = {}
+    while True:
+        line = stream.readline()
+        if not line or line in (b"\r\n", b"\n"):
+            return headers
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip()
+
+
+def _dechunk(body):
+    out = bytearray()
+    pos = 0
+    while pos < len(body):
+        end = body.find(b"\r\n", pos)
+        if end < 0:
+            break
+        size = int(body[pos:end].split(b";")[0] or b"0", 16)
+        if size == 0:
+            break
+        out += body[end + 2:end + 2 + size]
+        pos = end + 2 + size + 2
+    return bytes(out)
+
+
+def _http_payload(block):
+    head, _, body = block.partition(b"\r\n\r\n")
+    status, _, header_lines = head.partition(b"\r\n")
+    parts = status.split()
+    if len(parts) < 2 or parts[1] != b"200":
+        return None, None, None
+    headers = {}
+    x_robots_tag = []
+    for line in header_lines.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip()
+        # The header may repeat, once per user agent
+        if name.strip().lower() == b"x-robots-tag":
+            x_robots_tag.append(value.strip().decode("latin-1"))
+    if b"chunked" in headers.get(b"transfer-encoding", b"").lower():
+        body = _dechunk(body)
+    encoding = headers.get(b"content-encoding", b"").lower()
+    if encoding in (b"gzip", b"deflate"):
+        try:
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS if encoding == b"gzip" else zlib.MAX_WBITS)
+        except zlib.error:
+            return None, None, None
+    return headers.get(b"content-type", b""), body, "\n".join(x_robots_tag)
+
+
+def iter_warc(path):
+    """Yield ``(url, html, X-Robots-Tag)`` for every successful HTML response in a WARC file.
+
+    Records are read one at a time, so memory stays bounded by the largest
+    record rather than the archive.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as stream:
+        while True:
+            version = stream.readline()
+            if not version:
+                return
+            if not version.strip():
+                continue
+            headers = _read_headers(stream)
+            block = stream.read(int(headers.get(b"content-length", b"0")))
+            record_type = headers.get(b"warc-type", b"")
+            url = headers.get(b"warc-target-uri", b"").decode("utf-8", errors="replace").strip("<>")
+            if record_type == b"response" and headers.get(b"content-type", b"").startswith(b"application/http"):
+                content_type, body, x_robots_tag = _http_payload(block)
+            elif record_type == b"resource":
+                content_type, body, x_robots_tag = headers.get(b"content-type", b""), block, ""
+            else:
+                continue
+            if body is not None and b"html" in content_type.lower():
+                yield url, _decode(body, content_type), x_robots_tag
+
+
+def iter_sources(sources, base_url=None):
+    for source in sources:
+        if os.path.isdir(source):
+            yield from iter_directory(source, base_url)
+        elif source.endswith((".warc", ".warc.gz")):
+            yield from iter_warc(source)
+        else:
+            raise ValueError(f"Unsupported source: {source}")
+
+
+def _result_rows(urls, responses, answered):
+    _factor_scores, scores = score_batch(WEIGHTS, responses)
+    return [
+        (url, *(float(scores[bucket][i]) for bucket in scores), answered[i], responses[i].tobytes())
+        for i, url in enumerate(urls)
+    ]
+
+
+def _init_worker(robots):
+    global _worker_robots
+    _worker_robots = robots
+
+
+def audit_chunk(records, keyword="", keywords=None, unanswered=NO, site=(), robots=None):
+    """Audit and score a list of ``(url, html)`` or ``(url, html, X-Robots-Tag)`` records inside a worker.
+
+    Each result row is ``(url, *bucket scores, Overall, answered count, response codes)``;
+    a record that fails to audit is reported on stderr and left out.
+    With ``site`` (any of ``"links"``, ``"minhash"`` and ``"canonicals"``) the page's
+    site-wide signals are returned too, as ``(rows, [{"url": ..., "links": ..., ...}, ...])``.
+    A ``RobotsIndex`` in ``robots`` (by default the one the worker was started
+    with) adds robots.txt to the indexability check.
+    """
+    robots = _worker_robots if robots is None else robots
+    responses = np.full((len(records), len(RUBRIC)), unanswered, dtype=np.int8)
+    urls = []
+    answered = []
+    pages = []
+    allowed = robots.allowed_many([record[0] for record in records]) if robots is not None else [None] * len(records)
+    for i, (url, html, *x_robots_tag) in enumerate(records):
+        try:
+            answers, page = _audit_record(url, html, x_robots_tag, (keywords or {}).get(url, keyword), allowed[i], site)
+        except Exception as e:
+            # One broken page mustn't throw away the rest of the crawl
+            print(f"Skipping {url}: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+        for c, code in answers.items():
+            responses[len(urls), c] = code
+        urls.append(url)
+        answered.append(len(answers))
+        if site:
+            pages.append(page)
+    rows = _result_rows(urls, responses[:len(urls)], answered)
+    return (rows, pages) if site else rows
+
+
+def _audit_record(url, html, x_robots_tag, keyword, allowed, site):
+    """Answers for one record and, with ``site``, its site-wide page signals."""
+    page_url = url if "://" in url else None
+    signals = extract_signals(html, links="links" in site and page_url is not None, text="minhash" in site)
+    if x_robots_tag:
+        signals.robots.extend(x_robots_directives(x_robots_tag[0]))
+    answers = evaluate(signals, keyword, page_url)
+    if allowed is not None:
+        answers[INDEXABILITY_CRITERION] = combine_indexability(answers.get(INDEXABILITY_CRITERION), allowed)
+    page = None
+    if site:
+        page = {"url": url}
+        if "links" in site:
+            page["links"] = page_links(signals, page_url) if page_url else []
+        if "minhash" in site:
+            signature = MINHASHER.signature(main_text(signals))
+            page["minhash"] = None if signature is None else signature.tobytes()
+        if "canonicals" in site:
+            page["canonicals"] = page_canonicals(signals, page_url) if page_url else []
+    return answers, page
+
+
+def apply_site_answers(rows, answers):
+    """Merge ``{normalized url: {criterion id: code}}`` answers into result rows and rescore them."""
+    responses = np.array([np.frombuffer(row[-1], dtype=np.int8) for row in rows], dtype=np.int8).reshape(-1, len(RUBRIC))
+    answered = [row[-2] for row in rows]
+    for i, row in enumerate(rows):
+        for c, code in answers.get(normalize_url(row[0]) or row[0], {}).items():
+            responses[i, c] = code
+            answered[i] += 1
+    return _result_rows([row[0] for row in rows], responses, answered)
+
+
+def apply_sitemap(rows, index, batch=SITEMAP_BATCH):
+    """Answer sitemap inclusion for streamed result rows from a ``SitemapIndex``."""
+    for chunk in _chunks(rows, batch):
+        yield from apply_site_answers(chunk, index.answers([row[0] for row in chunk]))
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def audit_bulk(records, keyword="", keywords=None, unanswered=NO, workers=None, chunk_size=64, on_site=None,
+               site=("links",), robots=None):
+    """Yield scored result rows as chunks finish, keeping a bounded number in flight.
+
+    ``on_site`` receives each chunk's ``site`` page signals (see ``audit_chunk``).
+    A ``robots`` index is sent to each worker once, when it starts.
+    """
+    workers = workers or os.cpu_count() or 1
+    site = tuple(site) if on_site is not None else ()
+
+    def results(future):
+        result = future.result()
+        if site:
+            result, pages = result
+            on_site(pages)
+        return result
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(robots,)) as executor:
+        pending = set()
+        for chunk in _chunks(records, chunk_size):
+            # Ship each worker only the keywords for its own pages
+            chunk_keywords = {
+                record[0]: keywords[record[0]] for record in chunk if record[0] in keywords
+            } if keywords else None
+            pending.add(executor.submit(audit_chunk, chunk, keyword, chunk_keywords, unanswered, site))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from results(future)
+        for future in pending:
+            yield from results(future)
+
+
+def _load_keywords(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row[0]: row[1] for row in csv.reader(f) if len(row) >= 2}
+
+
+def _load_robots(specs, agent):
+    """``RobotsIndex`` from ``[ORIGIN=]PATH`` specs; a bare path applies to every host."""
+    index = RobotsIndex(agent)
+    for spec in specs:
+        origin, separator, path = spec.partition("=")
+        if not separator or "://" not in origin:
+            origin, path = None, spec
+        index.add(RobotsTxt.from_file(path), origin)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit saved pages in bulk and write per-URL scores.")
+    parser.add_argument("sources", nargs="+", help="Directories of HTML files and/or .warc/.warc.gz archives")
+    parser.add_argument("-o", "--output", default="-", help="CSV file to write (default: stdout)")
+    parser.add_argument("--keyword", default="", help="Target keyword applied to every page")
+    parser.add_argument("--keywords", help="CSV of url,keyword pairs overriding --keyword")
+    parser.add_argument("--base-url", help="URL that directory sources are saved under")
+    parser.add_argument("--unanswered", choices=("no", "na"), default="no",
+                        help="How criteria that can't be checked automatically are scored (default: no, as in the app)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Pages per task submitted to a worker")
+    parser.add_argument("--recommendations", help="JSONL file to write GPT recommendations per URL to")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent recommendation requests")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_RPM, help="Recommendation requests per minute")
+    parser.add_argument("--tpm", type=int, default=DEFAULT_TPM, help="Recommendation tokens per minute")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help="Maximum prompt tokens spent listing failing criteria")
+    parser.add_argument("--report", help="Word document to stream a multi-page portfolio report into")
+    parser.add_argument("--reports-zip", help="ZIP archive to write one Word report per URL into, "
+                        "with a manifest.csv of each URL's path")
+    ranking = parser.add_mutually_exclusive_group()
+    ranking.add_argument("--ranking-config", help="JSON file of ranking thresholds (see ranking.py)")
+    ranking.add_argument("--ranking-model", help="Ranking model fitted by calibration.py")
+    parser.add_argument("--history", nargs="?", const=default_history_path(),
+                        help="Record every audit in the history database (default location when no path is given)")
+    parser.add_argument("--fix-list", help="CSV file to write each page's minimum-effort fix list to")
+    parser.add_argument("--fix-target", type=float, default=9.0, help="Overall score the fix lists aim for")
+    parser.add_argument("--efforts", help="JSON file of effort points per criterion (see fixes.py)")
+    parser.add_argument("--link-graph", help="CSV file to write each page's click depth, in-degree and keyword "
+                                             "anchors to; also answers the orphan, depth and anchor text criteria")
+    parser.add_argument("--homepage", action="append",
+                        help="URL click depth is measured from (repeatable; default: every crawled site root)")
+    parser.add_argument("--duplicates", help="CSV file to write near-duplicate page pairs to; also answers the "
+                                             "content cannibalization criterion")
+    parser.add_argument("--duplicate-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Estimated Jaccard similarity of main text at which pages count as near-duplicates")
+    parser.add_argument("--canonicals", help="CSV file to write each page's canonical cluster representative, status "
+                                             "(self, chain, loop, ...) and hop count to")
+    parser.add_argument("--sitemap", action="append",
+                        help="Local sitemap or sitemap index file (.xml or .xml.gz) to check pages against; repeatable")
+    parser.add_argument("--robots", action="append",
+                        help="robots.txt file as [ORIGIN=]PATH, e.g. https://example.com=robots.txt; a bare path "
+                             "applies to every host without its own (repeatable)")
+    parser.add_argument("--robots-agent", default=DEFAULT_AGENT, help="User agent whose robots.txt rules apply")
+    args = parser.parse_args(argv)
+
+    keywords = _load_keywords(args.keywords) if args.keywords else None
+    ranking_estimator = None
+    if args.ranking_model:
+        ranking_estimator = CalibratedRanking.load(args.ranking_model)
+    elif args.ranking_config:
+        ranking_estimator = RankingTable.from_json(args.ranking_config)
+    unanswered = NA if args.unanswered == "na" else NO
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["url", *RUBRIC.buckets, "Overall", "auto_answered"])
+        graph_builder = LinkGraphBuilder() if args.link_graph else None
+        duplicate_index = DuplicateIndex() if args.duplicates else None
+        canonical_builder = CanonicalGraphBuilder() if args.canonicals else None
+        site = tuple(name for name, builder in (("links", graph_builder), ("minhash", duplicate_index),
+                                                ("canonicals", canonical_builder)) if builder is not None)
+        on_site = None
+        if site:
+            def on_site(pages):
+                for page in pages:
+                    if graph_builder is not None:
+                        graph_builder.add_page(page["url"], page["links"])
+                    if duplicate_index is not None:
+                        duplicate_index.add_page(page["url"], page["minhash"])
+                    if canonical_builder is not None:
+                        canonical_builder.add_page(page["url"], page["canonicals"])
+        rows = audit_bulk(iter_sources(args.sources, args.base_url), args.keyword, keywords, unanswered,
+                          args.workers, args.chunk_size, on_site, site,
+                          _load_robots(args.robots, args.robots_agent) if args.robots else None)
+        if on_site is not None:
+            # Site-wide answers need every page first, so results are held back until the crawl is read
+            rows = list(rows)
+            answers = {}
+            if graph_builder is not None:
+                graph = graph_builder.build(args.homepage)
+                write_link_graph(graph, args.link_graph, args.keyword, keywords)
+                answers = graph.answers(args.keyword, keywords)
+            representatives = None
+            if canonical_builder is not None:
+                clusters = canonical_builder.build()
+                write_canonicals(clusters, args.canonicals)
+                representatives = clusters.representatives()
+            if duplicate_index is not None:
+                pairs = duplicate_index.find_duplicates(args.duplicate_threshold, args.keyword, keywords,
+                                                        representatives=representatives)
+                write_duplicates(pairs, args.duplicates)
+                for url, page in duplicate_index.answers(pairs).items():
+                    answers.setdefault(url, {}).update(page)
+            rows = apply_site_answers(rows, answers)
+        if args.sitemap:
+            rows = apply_sitemap(rows, SitemapIndex.from_files(args.sitemap))
+        history = HistoryStore(args.history, ranking_estimator) if args.history else None
+        batches = _audit_batches(rows, writer, history)
+        efforts = load_efforts(args.efforts) if args.fix_list else None
+        audits = None
+        if args.recommendations:
+            # Recommendations are generated for the whole crawl at once, so audits are kept until it's read
+            audits = [audit for batch in batches for audit in batch]
+        else:
+            # Every other output is per page, so audits stream through in batches
+            pages = _stream_outputs(batches, args.fix_list, args.fix_target, efforts, args.report, ranking_estimator)
+            if args.reports_zip:
+                export_reports_zip(pages, args.reports_zip, args.workers, progress=_print_progress)
+                print(file=sys.stderr)
+            else:
+                for _page in pages:
+                    pass
+        if history is not None:
+            history.close()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if audits is None:
+        return
+    if args.fix_list:
+        write_fix_list(audits, args.fix_list, args.fix_target, efforts)
+    recommendations = write_recommendations(audits, args.recommendations, args.concurrency, args.rpm, args.tpm,
+                                            args.token_budget)
+    pages = _report_pages(audits, recommendations, ranking_estimator)
+    if args.report:
+        export_portfolio(pages, args.report)
+    if args.reports_zip:
+        export_reports_zip(pages, args.reports_zip, args.workers, progress=_print_progress)
+        print(file=sys.stderr)
+
+
+def _audit_batches(rows, writer, history, size=HISTORY_BATCH):
+    """Write result rows to the CSV writer (and history) and yield them as ``(url, responses, scores)`` audit batches."""
+    for batch in _chunks(rows, size):
+        audits = []
+        for row in batch:
+            writer.writerow([row[0], *(f"{score:.2f}" for score in row[1:-2]), row[-2]])
+            audits.append((row[0], np.frombuffer(row[-1], dtype=np.int8), row[1:-2]))
+        if history is not None:
+            history.record_many([(url, responses) for url, responses, _scores in audits])
+        yield audits
+
+
+def _report_pages(audits, recommendations, ranking_estimator=None):
+    """``(url, responses, scores, recommendations, estimated_ranking)`` report pages for audits."""
+    labels = (*RUBRIC.buckets, "Overall")
+    all_scores = np.array([scores for _url, _responses, scores in audits], dtype=np.float64).reshape(-1, len(labels))
+    rankings = estimate_rankings(all_scores[:, -1], all_scores[:, :-1], ranking_estimator).tolist()
+    return [
+        (url, responses, dict(zip(labels, scores)), text, ranking)
+        for (url, responses, scores), text, ranking in zip(audits, recommendations, rankings)
+    ]
+
+
+def _stream_outputs(batches, fix_list=None, fix_target=9.0, efforts=None, report=None, ranking_estimator=None):
+    """Write fix lists and the portfolio report batch by batch, yielding each report page for other consumers."""
+    with ExitStack() as stack:
+        fixes = None
+        if fix_list:
+            fixes = csv.writer(stack.enter_context(open(fix_list, "w", newline="", encoding="utf-8")))
+            fixes.writerow(FIX_LIST_HEADER)
+        portfolio = stack.enter_context(PortfolioWriter(report)) if report else None
+        for audits in batches:
+            if fixes is not None:
+                write_fixes(fixes, audits, fix_target, efforts)
+            for page in _report_pages(audits, [""] * len(audits), ranking_estimator):
+                if portfolio is not None:
+                    portfolio.add_page(*page)
+                yield page
+
+
+def _print_progress(done, total):
+    print(f"\rReports: {done}/{total or '?'}", end="", file=sys.stderr, flush=True)
+
+
+def write_link_graph(graph, path, keyword="", keywords=None):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["url", "depth", "in_degree", "keyword_anchors"])
+        writer.writerows(graph.metrics(keyword, keywords))
+
+
+def write_canonicals(clusters, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["url", "canonical", "representative", "status", "hops", "cluster_size"])
+        writer.writerows(clusters.rows())
+
+
+def write_duplicates(pairs, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["url", "duplicate_url", "jaccard", "shared_keyword"])
+        writer.writerows((url, other, f"{jaccard:.3f}", keyword) for url, other, jaccard, keyword in pairs)
+
+
+def write_fix_list(audits, path, target, efforts):
+    """Solve and write the minimum-effort fix list for ``(url, responses, scores)`` audits."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIX_LIST_HEADER)
+        write_fixes(writer, audits, target, efforts)
+
+
+def write_fixes(writer, audits, target, efforts):
+    """Solve a batch of audits' fix lists and write their rows to a CSV writer."""
+    responses = np.array([responses for _url, responses, _scores in audits], dtype=np.int8).reshape(-1, len(RUBRIC))
+    selected, total_effort, new_overall = solve_fixes(responses, target, efforts)
+    names = [f"{RUBRIC.factors[RUBRIC.criterion_factor[c]]}: {RUBRIC.criteria[c]}" for c in range(len(RUBRIC))]
+    for i, (url, _responses, scores) in enumerate(audits):
+        effort = "unreachable" if total_effort[i] < 0 else total_effort[i]
+        fixes = "; ".join(names[c] for c in np.flatnonzero(selected[i]))
+        writer.writerow([url, f"{scores[-1]:.2f}", f"{target:.2f}", effort, f"{new_overall[i]:.2f}", fixes])
+
+
+def write_recommendations(audits, path, concurrency=DEFAULT_CONCURRENCY, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM,
+                          token_budget=DEFAULT_TOKEN_BUDGET):
+    """Generate recommendations for ``(url, responses, scores)`` audits, write them as JSONL and return the texts."""
+    cache = RecommendationCache(default_cache_path())
+    results = generate_recommendations([responses for _url, responses, _scores in audits], concurrency=concurrency,
+                                       rpm=rpm, tpm=tpm, cache=cache, token_budget=token_budget)
+    texts = []
+    with open(path, "w", encoding="utf-8") as f:
+        for (url, _responses, _scores), result in zip(audits, results):
+            if isinstance(result, Exception):
+                record = {"url": url, "error": str(result)}
+                texts.append("Unable to generate recommendations at this time.")
+            else:
+                record = {"url": url, "recommendations": result}
+                texts.append(result)
+            f.write(json.dumps(record) + "\n")
+    return texts
+
+
+if __name__ == "__main__":
+    main()
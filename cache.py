@@ -0,0 +1,88 @@
+"""Persistent SQLite cache for generated recommendations.
+
+Entries expire ``ttl`` seconds after they were written and the least
+recently read entries are evicted once the cache holds more than
+``max_entries``. Hit and miss counts are stored alongside the entries so
+ratios survive app restarts.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL = 30 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def data_dir():
+    """Directory for the tool's local databases (``SEO_GRADER_CACHE_DIR`` overrides)."""
+    cache_dir = os.environ.get("SEO_GRADER_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "seo-page-grader")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def default_cache_path():
+    return os.path.join(data_dir(), "recommendations.sqlite3")
+
+
+class RecommendationCache:
+    def __init__(self, path, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Streamlit serves sessions from several threads; access is serialized by the lock
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+            CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0);
+        """)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._db.execute("UPDATE stats SET value = value + 1 WHERE name = 'misses'")
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._db.execute("UPDATE stats SET value = value + 1 WHERE name = 'hits'")
+            return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (key, value, now, now))
+            if self.ttl is not None:
+                self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+            (count,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._db.execute("SELECT name, value FROM stats"))
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "hits": counts["hits"],
+            "misses": counts["misses"],
+            "hit_ratio": counts["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,196 @@
+"""Ranking calibration against observed search positions.
+
+Fits a monotone mapping from audit scores to the average position pages
+actually hold (e.g. a Search Console export joined to ``bulk.py`` output).
+The scores are combined into one index with non-negative least-squares
+weights, the index is cut into quantile bins, and the 25th, 50th and 75th
+percentile positions of each bin are made non-increasing with pool
+adjacent violators, so a higher score never predicts a worse position.
+
+Usage::
+
+    python calibration.py audits.csv [-o ranking_model.npz] [--bins 50]
+
+The input (CSV or Parquet) needs ``Overall``, one column per bucket and a
+position column (Parquet needs pyarrow). Once the model file is in place the
+app and the bulk CLI use it instead of the threshold table.
+"""
+import argparse
+import os
+
+import numpy as np
+
+from cache import data_dir
+from rubric import RUBRIC
+
+MODEL_ENV = "SEO_GRADER_RANKING_MODEL"
+FEATURES = ("Overall", *RUBRIC.buckets)
+QUANTILES = (0.25, 0.5, 0.75)
+DEFAULT_BINS = 50
+MIN_BIN_SIZE = 20
+# Beyond this, positions are reported as "100+" like the threshold table
+MAX_POSITION = 100
+
+
+def default_model_path():
+    return os.environ.get(MODEL_ENV) or os.path.join(data_dir(), "ranking_model.npz")
+
+
+def _isotonic_decreasing(values, weights):
+    """Weighted pool-adjacent-violators fit of a non-increasing sequence."""
+    means, totals, sizes = [], [], []
+    for value, weight in zip(values.tolist(), weights.tolist()):
+        means.append(value)
+        totals.append(weight)
+        sizes.append(1)
+        while len(means) > 1 and means[-2] < means[-1]:
+            weight = totals[-2] + totals[-1]
+            means[-2] = (means[-2] * totals[-2] + means[-1] * totals[-1]) / weight
+            totals[-2] = weight
+            sizes[-2] += sizes[-1]
+            del means[-1], totals[-1], sizes[-1]
+    return np.repeat(means, sizes)
+
+
+def _feature_weights(features, positions):
+    """Non-negative weights (summing to 1) combining the score columns into one index."""
+    design = np.column_stack([features, np.ones(len(features))])
+    coefficients = np.linalg.lstsq(design, -positions, rcond=None)[0][:-1]
+    # Negative weights would let a better score predict a worse position
+    weights = np.clip(coefficients, 0, None)
+    if weights.sum() <= 0:
+        weights = np.zeros(features.shape[1])
+        weights[0] = 1.0
+    return weights / weights.sum()
+
+
+def _range_label(low, high):
+    if low >= MAX_POSITION:
+        return f"{MAX_POSITION}+"
+    if high > MAX_POSITION:
+        return f"{low}-{MAX_POSITION}+"
+    return str(low) if low == high else f"{low}-{high}"
+
+
+class CalibratedRanking:
+    """Monotone score-to-position model; see ``fit`` and ``load``."""
+    __slots__ = ("weights", "centers", "curves", "counts")
+
+    def __init__(self, weights, centers, curves, counts):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.centers = np.asarray(centers, dtype=np.float64)
+        # One row per entry of QUANTILES
+        self.curves = np.asarray(curves, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def fit(cls, features, positions, bins=DEFAULT_BINS, min_bin_size=MIN_BIN_SIZE):
+        """Fit on an N x ``FEATURES`` score matrix and N observed average positions."""
+        features = np.asarray(features, dtype=np.float64)
+        positions = np.asarray(positions, dtype=np.float64)
+        keep = np.isfinite(features).all(axis=1) & np.isfinite(positions) & (positions >= 1)
+        features, positions = features[keep], positions[keep]
+        if len(positions) < min_bin_size:
+            raise ValueError(f"Need at least {min_bin_size} pages with a position to calibrate, got {len(positions)}")
+
+        weights = _feature_weights(features, positions)
+        index = features @ weights
+        bins = max(1, min(bins, len(positions) // min_bin_size))
+        edges = np.unique(np.quantile(index, np.linspace(0, 1, bins + 1)))
+        bin_ids = np.searchsorted(edges[1:-1], index, side="right")
+        counts = np.bincount(bin_ids, minlength=len(edges) - 1)
+        occupied = counts > 0
+        centers = (np.bincount(bin_ids, weights=index, minlength=len(counts)) / np.maximum(counts, 1))[occupied]
+
+        # Sort positions within each bin once, then read every quantile by offset
+        order = np.argsort(positions, kind="stable")
+        order = order[np.argsort(bin_ids[order], kind="stable")]
+        sorted_positions = positions[order]
+        starts = (np.cumsum(counts) - counts)[occupied]
+        counts = counts[occupied]
+        curves = np.array([
+            _isotonic_decreasing(sorted_positions[starts + np.floor(q * (counts - 1)).astype(np.int64)], counts)
+            for q in QUANTILES
+        ])
+        return cls(weights, centers, curves, counts)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, features=np.array(FEATURES), weights=self.weights, centers=self.centers,
+                     curves=self.curves, counts=self.counts)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if tuple(data["features"].tolist()) != FEATURES:
+                raise ValueError(f"{path} was fitted on {data['features'].tolist()}, expected {list(FEATURES)}")
+            return cls(data["weights"], data["centers"], data["curves"], data["counts"])
+
+    def _index(self, overall_scores, bucket_scores):
+        overall_scores = np.asarray(overall_scores, dtype=np.float64)
+        if bucket_scores is None:
+            if self.weights[1:].any():
+                raise ValueError("This ranking model needs bucket scores as well as Overall")
+            return overall_scores * self.weights[0]
+        bucket_scores = np.asarray(bucket_scores, dtype=np.float64)
+        return overall_scores * self.weights[0] + bucket_scores @ self.weights[1:]
+
+    def predict(self, overall_scores, bucket_scores=None):
+        """Predicted ``(25th, 50th, 75th percentile)`` positions, each shaped like ``overall_scores``.
+
+        ``bucket_scores`` has one trailing column per bucket in ``RUBRIC`` order.
+        """
+        index = self._index(overall_scores, bucket_scores)
+        return tuple(np.interp(index, self.centers, curve) for curve in self.curves)
+
+    def estimate_batch(self, overall_scores, bucket_scores=None):
+        low, _median, high = self.predict(overall_scores, bucket_scores)
+        # Anything past MAX_POSITION reads the same, so both ends are capped there
+        low = np.clip(np.floor(low), 1, MAX_POSITION).astype(np.int64)
+        high = np.clip(np.ceil(high).astype(np.int64), low, MAX_POSITION + 1)
+        # Only a few hundred distinct ranges occur, so format each once
+        codes = low * (MAX_POSITION + 2) + high
+        present = np.flatnonzero(np.bincount(codes.ravel()))
+        lookup = np.zeros(present[-1] + 1 if len(present) else 1, dtype=np.int64)
+        lookup[present] = np.arange(len(present))
+        labels = np.array([_range_label(*divmod(int(code), MAX_POSITION + 2)) for code in present] or [""])
+        return labels[lookup[codes]]
+
+    def estimate(self, overall_score, bucket_scores=None):
+        return str(self.estimate_batch([overall_score], None if bucket_scores is None else [bucket_scores])[0])
+
+
+def load_dataset(path, position_column="position"):
+    """Read ``FEATURES`` and the position column from a CSV or Parquet file."""
+    import pandas as pd
+
+    columns = [*FEATURES, position_column]
+    if path.endswith((".parquet", ".pq")):
+        frame = pd.read_parquet(path, columns=columns)
+    else:
+        frame = pd.read_csv(path, usecols=columns, dtype={column: "float64" for column in columns})
+    return frame[list(FEATURES)].to_numpy(dtype=np.float64), frame[position_column].to_numpy(dtype=np.float64)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit the ranking model on observed average positions.")
+    parser.add_argument("dataset", help="CSV or Parquet file with Overall, bucket and position columns")
+    parser.add_argument("-o", "--output", default=None, help="Model file to write (default: the app's model location)")
+    parser.add_argument("--position-column", default="position", help="Column holding the observed average position")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="Number of quantile bins")
+    args = parser.parse_args(argv)
+
+    features, positions = load_dataset(args.dataset, args.position_column)
+    model = CalibratedRanking.fit(features, positions, args.bins)
+    output = args.output or default_model_path()
+    model.save(output)
+
+    median = model.predict(features[:, 0], features[:, 1:])[1]
+    error = np.abs(median - positions)[np.isfinite(positions)]
+    print(f"Fitted on {model.counts.sum()} pages in {len(model.centers)} bins; wrote {output}")
+    print("Index weights: " + ", ".join(f"{name} {weight:.3f}" for name, weight in zip(FEATURES, model.weights)))
+    print(f"Median absolute error of the median position: {np.median(error):.2f}")
+
+
+if __name__ == "__main__":
+    main()
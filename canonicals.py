@@ -0,0 +1,159 @@
+"""Canonical clusters of a crawl: where every page's rel=canonical chain ends.
+
+Workers reduce each page to its normalized canonical targets
+(``page_canonicals``). ``CanonicalGraphBuilder`` interns URLs to integer
+ids and keeps one parent pointer per page: its canonical target, or itself
+when it has none (or only conflicting ones). Every page has at most one
+parent, so finding each page's cluster representative is union-find's
+``find`` for every page at once; ``resolve`` does it with pointer jumping,
+which compresses all paths together in ``log2(pages)`` NumPy gathers and
+counts the hops on the way. Chains that never reach a page canonicalizing
+to itself end in a loop; a loop is reported under its lexicographically
+smallest URL, but search engines ignore looping canonicals, so
+``representatives`` keeps looping pages apart.
+"""
+from array import array
+
+import numpy as np
+
+from linkgraph import join_url, normalize_url
+
+# Page statuses, in the order of STATUS_NAMES
+NONE, SELF, CANONICALIZED, CHAIN, LOOP, CONFLICTING, INVALID = range(7)
+STATUS_NAMES = ("none", "self", "canonicalized", "chain", "loop", "conflicting", "invalid")
+
+
+def page_canonicals(signals, url):
+    """A page's distinct canonical targets, normalized; None stands for one that isn't a parsable HTTP(S) URL."""
+    base = (join_url(url, signals.base) if signals.base else None) or url
+    targets = (join_url(base, href.strip()) for href in signals.canonicals)
+    return list(dict.fromkeys(None if target is None else normalize_url(target) for target in targets))
+
+
+def resolve(parents):
+    """Root, hop count and loop flag per node of a parent-pointer array (roots point to themselves).
+
+    Nodes whose chain ends in a loop get a root on that loop and -1 hops.
+    """
+    parents = np.asarray(parents, dtype=np.int64)
+    nodes = np.arange(len(parents))
+    root = parents.copy()
+    hops = (root != nodes).astype(np.int64)
+    # 2 ** rounds >= nodes steps reach every chain's end, or its loop
+    for _ in range(max(1, len(parents).bit_length())):
+        jumped = root[root]
+        if np.array_equal(jumped, root):
+            break
+        hops += hops[root]
+        root = jumped
+    looping = parents[root] != root
+    hops[looping] = -1
+    return root, hops, looping
+
+
+def _loop_minimum(parents, root, looping, urls):
+    """The node with the smallest URL on each looping node's loop."""
+    # Rank looping nodes by URL so the choice doesn't depend on crawl order
+    ranked = np.array(sorted(np.flatnonzero(looping).tolist(), key=urls.__getitem__), dtype=np.int64)
+    smallest = np.full(len(parents), len(ranked), dtype=np.int64)
+    smallest[ranked] = np.arange(len(ranked))
+    jump = np.asarray(parents, dtype=np.int64)
+    for _ in range(max(1, len(parents).bit_length())):
+        smallest = np.minimum(smallest, smallest[jump])
+        jump = jump[jump]
+    return ranked[smallest[root[looping]]]
+
+
+class CanonicalGraphBuilder:
+    """Accumulates crawled pages and their canonical targets with one integer per URL."""
+
+    def __init__(self):
+        self._ids = {}
+        self.urls = []
+        self._parents = array("I")
+        self._crawled = bytearray()
+        self._flags = bytearray()
+
+    def _id(self, url):
+        node = self._ids.get(url)
+        if node is None:
+            node = self._ids[url] = len(self.urls)
+            self.urls.append(url)
+            self._parents.append(node)
+            self._crawled.append(0)
+            self._flags.append(NONE)
+        return node
+
+    def add_page(self, url, canonicals):
+        """Record a crawled page and its ``page_canonicals``; repeated URLs keep their first capture."""
+        url = normalize_url(url)
+        if url is None:
+            return
+        node = self._id(url)
+        if self._crawled[node]:
+            return
+        self._crawled[node] = 1
+        targets = [target for target in canonicals if target is not None]
+        if len(targets) > 1:
+            # Search engines ignore canonicals that disagree
+            self._flags[node] = CONFLICTING
+        elif targets:
+            self._parents[node] = self._id(targets[0])
+            self._flags[node] = SELF if self._parents[node] == node else CANONICALIZED
+        elif canonicals:
+            self._flags[node] = INVALID
+
+    def build(self):
+        parents = np.frombuffer(self._parents, dtype=np.uint32).astype(np.int64)
+        root, hops, looping = resolve(parents)
+        representative = root.copy()
+        if looping.any():
+            representative[looping] = _loop_minimum(parents, root, looping, self.urls)
+
+        status = np.frombuffer(self._flags, dtype=np.uint8).copy()
+        status[(status == CANONICALIZED) & (hops > 1)] = CHAIN
+        status[looping] = LOOP
+        crawled = np.frombuffer(self._crawled, dtype=np.uint8).astype(bool)
+        return CanonicalClusters(self, parents, representative, hops, status, crawled)
+
+
+class CanonicalClusters:
+    __slots__ = ("urls", "parents", "representative", "hops", "status", "crawled", "cluster_size", "_ids")
+
+    def __init__(self, builder, parents, representative, hops, status, crawled):
+        self.urls = builder.urls
+        self._ids = builder._ids
+        self.parents = parents
+        self.representative = representative
+        self.hops = hops
+        self.status = status
+        self.crawled = crawled
+        self.cluster_size = np.bincount(representative[crawled], minlength=len(parents))
+
+    def __len__(self):
+        return len(self.urls)
+
+    def counts(self):
+        """Crawled pages per status name."""
+        counts = np.bincount(self.status[self.crawled], minlength=len(STATUS_NAMES))
+        return dict(zip(STATUS_NAMES, counts.tolist()))
+
+    def rows(self):
+        """Yield ``(url, canonical, representative, status, hops, cluster size)`` for every crawled page."""
+        for node in np.flatnonzero(self.crawled).tolist():
+            parent = int(self.parents[node])
+            representative = int(self.representative[node])
+            yield (self.urls[node], self.urls[parent] if parent != node else "", self.urls[representative],
+                   STATUS_NAMES[self.status[node]], int(self.hops[node]), int(self.cluster_size[representative]))
+
+    def representatives(self):
+        """``{normalized url: cluster representative url}`` for every crawled page.
+
+        Only canonicals search engines follow merge pages: looping, conflicting
+        and invalid pages each stay their own cluster.
+        """
+        followed = np.isin(self.status, (NONE, SELF, CANONICALIZED, CHAIN))
+        return {
+            self.urls[node]: self.urls[self.representative[node] if followed[node] else node]
+            for node in np.flatnonzero(self.crawled).tolist()
+        }
@@ -0,0 +1,190 @@
+"""Near-duplicate content and cannibalization across a crawl.
+
+Workers reduce each page's main text (``auditor.main_text``) to a MinHash
+signature: the text is cut into overlapping word shingles, each shingle
+hashed to 64 bits, and the signature keeps the minimum of ``PERMUTATIONS``
+seeded mixing hashes over them. Matching signature positions estimate the
+Jaccard similarity of two pages' shingle sets.
+
+``find_duplicates`` stacks the signatures and bands them for locality-
+sensitive hashing: pages whose rows agree on a whole band share a bucket,
+and only bucket-mates are compared. Each band is one sort over the crawl,
+so the work grows near-linearly with the number of pages. Candidate pairs
+are kept when their estimated Jaccard reaches the threshold and they aren't
+known to target different keywords.
+"""
+import re
+import zlib
+
+import numpy as np
+
+from arrays import ranges
+from linkgraph import keyword_ids, normalize_url
+from rubric import NO, RUBRIC, YES
+
+SHINGLE_SIZE = 5
+PERMUTATIONS = 128
+BANDS = 32
+DEFAULT_THRESHOLD = 0.5
+# Buckets larger than this (templated pages sharing boilerplate) are linked
+# to their first member only instead of pairwise
+MAX_BUCKET = 50
+SEED = 20240611
+# Candidate pairs whose signatures are compared per step
+COMPARE_BATCH = 100_000
+
+CANNIBALIZATION_CRITERION = RUBRIC.criterion_id("Quality of Content", "Other pages don't cannibalize this one for content")
+
+WORD_RE = re.compile(r"\w+")
+# Odd multiplier combining word hashes into a shingle hash
+_SHINGLE_BASE = np.uint64(0x9E3779B97F4A7C15)
+_FINALIZER = np.uint64(0x94D049BB133111EB)
+
+
+class MinHasher:
+    """Fixed random hash family; the same seed gives the same signatures in every process."""
+    __slots__ = ("multipliers", "offsets", "shingle_size")
+
+    def __init__(self, permutations=PERMUTATIONS, shingle_size=SHINGLE_SIZE, seed=SEED):
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(0, 2 ** 63, permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.offsets = rng.integers(0, 2 ** 63, permutations, dtype=np.uint64)
+        self.shingle_size = shingle_size
+
+    def shingles(self, text):
+        """Distinct 64-bit hashes of the text's overlapping word shingles."""
+        words = WORD_RE.findall(text.lower())
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words), dtype=np.uint64, count=len(words))
+        size = min(self.shingle_size, len(words))
+        combined = np.zeros(len(words) - size + 1, dtype=np.uint64)
+        for k in range(size):
+            combined = combined * _SHINGLE_BASE + hashes[k:len(hashes) - size + 1 + k]
+        return np.unique(combined)
+
+    def signature(self, text):
+        """The text's MinHash signature as uint32s, or None when it has no words."""
+        shingles = self.shingles(text)
+        if not len(shingles):
+            return None
+        # A plain multiply-shift family isn't min-wise independent enough and
+        # overestimates similarity, so each seeded hash gets a splitmix64 finalizer
+        hashes = (shingles[:, np.newaxis] ^ self.offsets) * self.multipliers
+        hashes ^= hashes >> np.uint64(31)
+        hashes *= _FINALIZER
+        hashes ^= hashes >> np.uint64(32)
+        return (hashes.min(axis=0) >> np.uint64(32)).astype(np.uint32)
+
+
+MINHASHER = MinHasher()
+
+
+def _band_keys(signatures, bands):
+    """One 64-bit key per page and band, hashing that band's rows together."""
+    rows = signatures.shape[1] // bands
+    keys = np.zeros((len(signatures), bands), dtype=np.uint64)
+    for r in range(rows):
+        keys = keys * _SHINGLE_BASE + signatures[:, r::rows][:, :bands].astype(np.uint64)
+    return keys
+
+
+def candidate_pairs(signatures, bands=BANDS, max_bucket=MAX_BUCKET):
+    """Distinct ``(i, j)`` index pairs (``i < j``) sharing at least one LSH bucket."""
+    keys = _band_keys(signatures, bands)
+    pairs = []
+    for band in range(bands):
+        order = np.argsort(keys[:, band], kind="stable")
+        sorted_keys = keys[order, band]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        shared = sizes > 1
+        starts, sizes = starts[shared], sizes[shared]
+        if not len(starts):
+            continue
+        # Every member pairs with the members after it in buckets up to max_bucket
+        regular = sizes <= max_bucket
+        for offset in range(1, int(sizes[regular].max(initial=1))):
+            paired = regular & (sizes > offset)
+            left = ranges(starts[paired], sizes[paired] - offset)
+            pairs.append(np.stack([order[left], order[left + offset]]))
+        # Oversized buckets are starred on their first member
+        for start, size in zip(starts[sizes > max_bucket], sizes[sizes > max_bucket]):
+            members = order[start + 1:start + size]
+            pairs.append(np.stack([np.full(len(members), order[start]), members]))
+    if not pairs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs, axis=1).astype(np.int64), axis=0)
+    codes = np.unique(pairs[0] * len(signatures) + pairs[1])
+    return np.divmod(codes, len(signatures))
+
+
+def estimate_jaccard(signatures, left, right, batch=COMPARE_BATCH):
+    """Fraction of matching signature positions for each ``(left, right)`` pair."""
+    similarity = np.zeros(len(left), dtype=np.float64)
+    for start in range(0, len(left), batch):
+        part = slice(start, start + batch)
+        similarity[part] = (signatures[left[part]] == signatures[right[part]]).mean(axis=1)
+    return similarity
+
+
+class DuplicateIndex:
+    """Collects ``(url, signature)`` pairs from the crawl and finds near-duplicate pages among them."""
+
+    def __init__(self, permutations=PERMUTATIONS):
+        self.permutations = permutations
+        self.urls = []
+        self._ids = {}
+        self._signatures = []
+        # URLs crawled without any text to compare, in arrival order
+        self.skipped = {}
+
+    def add_page(self, url, signature):
+        """Record a page's signature (bytes or array); repeated URLs keep their first capture."""
+        url = normalize_url(url) or url
+        if url in self._ids or url in self.skipped:
+            return
+        if signature is None:
+            self.skipped[url] = None
+            return
+        self._ids[url] = len(self.urls)
+        self.urls.append(url)
+        self._signatures.append(np.frombuffer(signature, dtype=np.uint32) if isinstance(signature, bytes) else signature)
+
+    def signatures(self):
+        if not self._signatures:
+            return np.zeros((0, self.permutations), dtype=np.uint32)
+        return np.stack(self._signatures)
+
+    def find_duplicates(self, threshold=DEFAULT_THRESHOLD, keyword="", keywords=None, bands=BANDS,
+                        representatives=None):
+        """Near-duplicate page pairs as ``(url, url, estimated Jaccard, shared keyword)``, most similar first.
+
+        Pages assigned different target keywords don't compete with each
+        other and are left out, as are pages that ``representatives``
+        (``{url: canonical cluster representative}``) puts in one canonical
+        cluster; the shared keyword is "" when neither page has one.
+        """
+        signatures = self.signatures()
+        left, right = candidate_pairs(signatures, bands)
+        similarity = estimate_jaccard(signatures, left, right)
+        close = similarity >= threshold
+        left, right, similarity = left[close], right[close], similarity[close]
+
+        page_keywords, keyword_texts = keyword_ids(self.urls, keyword, keywords)
+        pairs = []
+        for i, j, jaccard in zip(left.tolist(), right.tolist(), similarity.tolist()):
+            first, second = int(page_keywords[i]), int(page_keywords[j])
+            if first >= 0 and second >= 0 and first != second:
+                continue
+            if representatives and representatives.get(self.urls[i], i) == representatives.get(self.urls[j], j):
+                continue
+            shared = max(first, second)
+            pairs.append((self.urls[i], self.urls[j], jaccard, keyword_texts[shared] if shared >= 0 else ""))
+        pairs.sort(key=lambda pair: -pair[2])
+        return pairs
+
+    def answers(self, pairs):
+        """Cannibalization answers for every compared page from ``find_duplicates`` output."""
+        duplicated = {url for pair in pairs for url in pair[:2]}
+        return {url: {CANNIBALIZATION_CRITERION: NO if url in duplicated else YES} for url in self.urls}
@@ -0,0 +1,129 @@
+"""Minimum-effort fix lists: which failing criteria to fix to reach a target Overall.
+
+Fixing a failing criterion (No -> Yes) leaves its factor's possible weight
+unchanged, so its Overall gain is ``weight / possible * 10`` scaled by the
+bucket weight over the bucket's factor count. The gain depends on the
+page's N/A answers through ``possible``, which is why a criterion's raw
+weight is not a usable marginal gain. Per-page gains are additive, so
+choosing fixes is a 0/1 knapsack cover over integer effort points, solved
+exactly for a whole batch of pages at once by dynamic programming.
+
+Efforts default to 1 point per criterion and can be set per criterion in
+a JSON file shaped like the rubric::
+
+    {"H1 Tag": {"Contains proper length": 1, "Contains primary keyword": 2}}
+"""
+import json
+import os
+
+import numpy as np
+
+from rubric import NA, NO, RUBRIC
+from scoring import WeightMatrix, score_batch
+
+EFFORT_CONFIG_ENV = "SEO_GRADER_EFFORT_CONFIG"
+DEFAULT_EFFORT = 1
+# Pages solved per DP block; bounds the per-criterion decision tables kept for backtracking
+BLOCK_SIZE = 1024
+# Summing gains in a different order than the scorer can miss a target by a few ulps
+TOLERANCE = 1e-9
+
+WEIGHTS = WeightMatrix()
+
+
+def load_efforts(path=None, rubric=RUBRIC):
+    """Effort points per criterion id, read from ``path`` (or ``SEO_GRADER_EFFORT_CONFIG``) when given."""
+    efforts = np.full(len(rubric), DEFAULT_EFFORT, dtype=np.int64)
+    path = path or os.environ.get(EFFORT_CONFIG_ENV)
+    if not path:
+        return efforts
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    for factor, criteria in config.items():
+        for criterion, effort in criteria.items():
+            if int(effort) != effort or effort < 1:
+                raise ValueError(f"Effort for {factor} > {criterion} must be a positive whole number, got {effort}")
+            efforts[rubric.criterion_id(factor, criterion)] = int(effort)
+    return efforts
+
+
+def fix_gains(responses, weights=WEIGHTS):
+    """Overall gain from fixing each failing criterion of an N x criteria response matrix (0 elsewhere)."""
+    rubric = weights.rubric
+    responses = np.atleast_2d(np.asarray(responses, dtype=np.int8))
+    possible = (responses != NA).astype(np.float64) @ weights.matrix
+    factor_scale = np.array([
+        10 * rubric.bucket_weights[rubric.factor_bucket[f]] / len(rubric.bucket_factors(rubric.factor_bucket[f]))
+        for f in range(len(rubric.factors))
+    ])
+    criterion_factor = np.asarray(rubric.criterion_factor)
+    criterion_weights = np.asarray(rubric.weights, dtype=np.float64)
+    failing = responses == NO
+    gains = np.zeros(responses.shape, dtype=np.float64)
+    np.divide(criterion_weights * factor_scale[criterion_factor], possible[:, criterion_factor],
+              out=gains, where=failing)
+    return gains
+
+
+def _solve_block(gains, needed, efforts):
+    n, criteria = gains.shape
+    capacity = int(efforts[gains.any(axis=0)].sum())
+    # best[i, e]: largest gain for page i using at most e effort points
+    best = np.zeros((n, capacity + 1), dtype=np.float64)
+    taken = {}
+    for c in np.flatnonzero(gains.any(axis=0)):
+        effort = int(efforts[c])
+        candidate = best[:, :capacity + 1 - effort] + gains[:, c, np.newaxis]
+        take = candidate > best[:, effort:]
+        best[:, effort:] = np.where(take, candidate, best[:, effort:])
+        taken[c] = take
+
+    reached = best >= (needed - TOLERANCE)[:, np.newaxis]
+    feasible = reached.any(axis=1)
+    budget = np.where(feasible, reached.argmax(axis=1), capacity)
+    total_effort = np.where(feasible, budget, -1)
+
+    # Walk the decisions back from each page's minimum budget
+    selected = np.zeros((n, criteria), dtype=bool)
+    rows = np.arange(n)
+    remaining = budget.copy()
+    for c in reversed(list(taken)):
+        effort = int(efforts[c])
+        column = remaining - effort
+        chosen = (column >= 0) & taken[c][rows, np.maximum(column, 0)]
+        selected[:, c] = chosen
+        remaining -= np.where(chosen, effort, 0)
+    return selected, total_effort
+
+
+def solve_fixes(responses, target, efforts=None, weights=WEIGHTS, block_size=BLOCK_SIZE):
+    """Cheapest set of fixes lifting each page's Overall to ``target``.
+
+    ``responses`` is an N x criteria matrix and ``efforts`` one positive
+    integer per criterion. Returns ``(selected, total_effort, new_overall)``:
+    an N x criteria boolean matrix of criteria to fix, the effort of each
+    plan and the Overall after it. Pages that already reach the target get
+    an empty plan; pages that cannot reach it get effort -1 and the plan
+    fixing everything that gains score.
+    """
+    responses = np.atleast_2d(np.asarray(responses, dtype=np.int8))
+    efforts = load_efforts() if efforts is None else np.asarray(efforts, dtype=np.int64)
+    overall = score_batch(weights, responses)[1]["Overall"]
+    needed = target - overall
+
+    selected = np.zeros(responses.shape, dtype=bool)
+    total_effort = np.zeros(len(responses), dtype=np.int64)
+    for start in range(0, len(responses), block_size):
+        block = slice(start, start + block_size)
+        gains = fix_gains(responses[block], weights)
+        selected[block], total_effort[block] = _solve_block(gains, needed[block], efforts)
+
+    fixed = np.where(selected, np.int8(1), responses)
+    new_overall = score_batch(weights, fixed)[1]["Overall"]
+    return selected, total_effort, new_overall
+
+
+def fix_plan(responses, target, efforts=None, weights=WEIGHTS):
+    """One page's plan as ``(criterion ids, total effort, new Overall)``; effort is -1 when unreachable."""
+    selected, total_effort, new_overall = solve_fixes([responses], target, efforts, weights)
+    return np.flatnonzero(selected[0]).tolist(), int(total_effort[0]), float(new_overall[0])
@@ -0,0 +1,175 @@
+"""Persistent audit history: every run's responses and scores per URL.
+
+Runs live in a SQLite database in WAL mode. Response codes, factor scores
+and bucket scores are stored as packed arrays; ``overall`` and ``ranking``
+are plain columns. A ``latest`` table keeps each URL's newest run and the
+Overall of the run before it, so "latest per URL" and "dropped by more
+than X" are index lookups rather than scans over every run.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from cache import data_dir
+from ranking import estimate_rankings
+from rubric import RUBRIC
+from scoring import WeightMatrix, score_batch
+
+WEIGHTS = WeightMatrix()
+
+SCHEMA = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    url_id INTEGER NOT NULL REFERENCES urls (id),
+    run_at REAL NOT NULL,
+    overall REAL NOT NULL,
+    ranking TEXT NOT NULL,
+    bucket_scores BLOB NOT NULL,
+    factor_scores BLOB NOT NULL,
+    responses BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_url_time ON runs (url_id, run_at);
+CREATE TABLE IF NOT EXISTS latest (
+    url_id INTEGER PRIMARY KEY REFERENCES urls (id),
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    run_at REAL NOT NULL,
+    overall REAL NOT NULL,
+    previous_overall REAL,
+    delta REAL
+);
+CREATE INDEX IF NOT EXISTS latest_delta ON latest (delta);
+"""
+
+# Newer runs replace the latest entry; backfilled older runs leave it alone
+UPSERT_LATEST = """
+INSERT INTO latest (url_id, run_id, run_at, overall) VALUES (?, ?, ?, ?)
+ON CONFLICT (url_id) DO UPDATE SET
+    previous_overall = latest.overall,
+    delta = excluded.overall - latest.overall,
+    run_id = excluded.run_id,
+    run_at = excluded.run_at,
+    overall = excluded.overall
+WHERE excluded.run_at >= latest.run_at
+"""
+
+
+def default_history_path():
+    return os.path.join(data_dir(), "history.sqlite3")
+
+
+def _run(row):
+    run_id, url, run_at, overall, ranking, bucket_scores, factor_scores, responses = row
+    return {
+        "id": run_id,
+        "url": url,
+        "run_at": run_at,
+        "scores": {**dict(zip(RUBRIC.buckets, np.frombuffer(bucket_scores).tolist())), "Overall": overall},
+        "ranking": ranking,
+        "factor_scores": dict(zip(RUBRIC.factors, np.frombuffer(factor_scores).tolist())),
+        "responses": np.frombuffer(responses, dtype=np.int8),
+    }
+
+
+RUN_COLUMNS = "runs.id, urls.url, runs.run_at, runs.overall, runs.ranking, runs.bucket_scores, runs.factor_scores, runs.responses"
+
+
+class HistoryStore:
+    def __init__(self, path, ranking_estimator=None):
+        self.ranking_estimator = ranking_estimator
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def record(self, url, responses, run_at=None):
+        return self.record_many([(url, responses)], run_at)[0]
+
+    def record_many(self, audits, run_at=None):
+        """Score and store ``(url, responses)`` audits in one transaction; returns their run ids.
+
+        Scores are recomputed from the responses with ``score_batch`` so the
+        stored values always match the rubric.
+        """
+        audits = list(audits)
+        if not audits:
+            return []
+        run_at = time.time() if run_at is None else run_at
+        responses = np.array([np.asarray(r, dtype=np.int8) for _url, r in audits], dtype=np.int8)
+        factor_scores, scores = score_batch(WEIGHTS, responses)
+        bucket_scores = np.column_stack([scores[bucket] for bucket in RUBRIC.buckets])
+        overall = scores["Overall"]
+        rankings = estimate_rankings(overall, bucket_scores, self.ranking_estimator).tolist()
+
+        ids = []
+        with self._lock, self._db:
+            for i, (url, _responses) in enumerate(audits):
+                url_id = self._url_id(url)
+                cursor = self._db.execute(
+                    "INSERT INTO runs (url_id, run_at, overall, ranking, bucket_scores, factor_scores, responses)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url_id, run_at, float(overall[i]), rankings[i],
+                     bucket_scores[i].tobytes(), factor_scores[i].tobytes(), responses[i].tobytes()),
+                )
+                self._db.execute(UPSERT_LATEST, (url_id, cursor.lastrowid, run_at, float(overall[i])))
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def _url_id(self, url):
+        row = self._db.execute("SELECT id FROM urls WHERE url = ?", (url,)).fetchone()
+        if row:
+            return row[0]
+        return self._db.execute("INSERT INTO urls (url) VALUES (?)", (url,)).lastrowid
+
+    def latest(self, url=None, limit=None):
+        """Newest run for ``url``, or for every URL when ``url`` is None."""
+        query = f"SELECT {RUN_COLUMNS} FROM latest JOIN runs ON runs.id = latest.run_id JOIN urls ON urls.id = latest.url_id"
+        with self._lock:
+            if url is not None:
+                row = self._db.execute(query + " WHERE urls.url = ?", (url,)).fetchone()
+                return _run(row) if row else None
+            rows = self._db.execute(query + " ORDER BY urls.url LIMIT ?", (-1 if limit is None else limit,)).fetchall()
+        return [_run(row) for row in rows]
+
+    def latest_responses(self):
+        """URLs and an N x criteria response matrix of every URL's newest run, ordered by URL."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT urls.url, runs.responses FROM latest JOIN runs ON runs.id = latest.run_id"
+                " JOIN urls ON urls.id = latest.url_id ORDER BY urls.url"
+            ).fetchall()
+        responses = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.int8).reshape(-1, len(RUBRIC))
+        return [row[0] for row in rows], responses
+
+    def trend(self, url, since=None, until=None):
+        """Every run for ``url`` in time order, optionally limited to ``[since, until]``."""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {RUN_COLUMNS} FROM runs JOIN urls ON urls.id = runs.url_id"
+                " WHERE urls.url = ? AND runs.run_at >= ? AND runs.run_at <= ? ORDER BY runs.run_at",
+                (url, float("-inf") if since is None else since, float("inf") if until is None else until),
+            ).fetchall()
+        return [_run(row) for row in rows]
+
+    def drops(self, threshold, limit=None):
+        """URLs whose latest Overall fell more than ``threshold`` below the previous run, biggest drop first.
+
+        Returns ``(url, previous_overall, overall, delta, run_at)`` tuples.
+        """
+        with self._lock:
+            return self._db.execute(
+                "SELECT urls.url, latest.previous_overall, latest.overall, latest.delta, latest.run_at"
+                " FROM latest JOIN urls ON urls.id = latest.url_id"
+                " WHERE latest.delta < ? ORDER BY latest.delta LIMIT ?",
+                (-threshold, -1 if limit is None else limit),
+            ).fetchall()
+
+    def close(self):
+        self._db.close()
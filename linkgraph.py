@@ -0,0 +1,256 @@
+"""Internal link graph of a crawl and the criteria it answers.
+
+Workers reduce each page to its same-host links with normalized anchor
+text (``page_links``); ``LinkGraphBuilder`` interns URLs and anchors to
+integer ids and appends edges to flat arrays, one page at a time.
+``build`` turns them into a ``LinkGraph`` in CSR form (``indptr`` and
+``indices`` over node ids) with BFS click depth from the homepage,
+in-degree from other pages and the number of keyword-bearing inbound
+anchors, all computed with NumPy over the whole graph at once.
+"""
+import re
+from array import array
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import numpy as np
+
+from arrays import ranges
+from rubric import NO, RUBRIC, YES
+
+MAX_DEPTH = 5
+# scheme://netloc, path, ?query; anything unusual goes through urlsplit
+URL_RE = re.compile(r"([A-Za-z][A-Za-z0-9+.-]*)://([^/?#\[\]]+)([^?#\[\]]*)(?:\?([^#]*))?(?:#.*)?")
+
+ORPHAN_CRITERION = RUBRIC.criterion_id("Page Orphan Status", "Page isn't orphaned")
+DEPTH_CRITERION = RUBRIC.criterion_id("URL Slug", "Depth of 5 or less from the homepage")
+ANCHOR_CRITERION = RUBRIC.criterion_id(
+    "Internal Linking", "Other pages properly point to this one with target keyword included in anchor text"
+)
+
+
+def normalize_url(url):
+    """Lowercase scheme and host, default the path to ``/`` and drop the fragment; None for non-HTTP or unparsable URLs."""
+    match = URL_RE.fullmatch(url) if url.isprintable() and " " not in url else None
+    if match is not None:
+        scheme, netloc, path, query = match.groups()
+        scheme = scheme.lower()
+        if scheme not in ("http", "https"):
+            return None
+        return f"{scheme}://{netloc.lower()}{path or '/'}{'?' + query if query else ''}"
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        # e.g. an unclosed IPv6 bracket
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return urlunsplit((scheme, parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+
+def join_url(base, href):
+    """``urljoin(base, href)``, or None when either can't be parsed."""
+    try:
+        return urljoin(base, href)
+    except ValueError:
+        return None
+
+
+def page_links(signals, url):
+    """Distinct ``(target URL, lowercased anchor text)`` pairs for a page's links to its own host.
+
+    Links whose href can't be parsed are skipped.
+    """
+    url = normalize_url(url)
+    if url is None:
+        return []
+    base = (join_url(url, signals.base) if signals.base else None) or url
+    host = urlsplit(url).netloc
+    links = {}
+    for href, text in signals.links:
+        target = join_url(base, href.strip())
+        target = normalize_url(target) if target is not None else None
+        if target is not None and urlsplit(target).netloc == host:
+            links[target, text.lower()] = None
+    return list(links)
+
+
+class LinkGraphBuilder:
+    """Accumulates crawled pages and their links with one integer per URL, edge and anchor."""
+
+    def __init__(self):
+        self._ids = {}
+        self.urls = []
+        self._crawled = bytearray()
+        self._anchor_ids = {}
+        self.anchors = []
+        # Distinct (source, target) edges, grouped by source page in arrival order
+        self._targets = array("I")
+        self._page_sources = array("I")
+        self._page_counts = array("I")
+        # (target, anchor) pairs of links between different pages, distinct per linking page
+        self._anchor_targets = array("I")
+        self._anchor_texts = array("I")
+
+    def _id(self, url):
+        node = self._ids.get(url)
+        if node is None:
+            node = self._ids[url] = len(self.urls)
+            self.urls.append(url)
+            self._crawled.append(0)
+        return node
+
+    def _anchor_id(self, text):
+        anchor = self._anchor_ids.get(text)
+        if anchor is None:
+            anchor = self._anchor_ids[text] = len(self.anchors)
+            self.anchors.append(text)
+        return anchor
+
+    def add_page(self, url, links):
+        """Record a crawled page and its ``page_links``; repeated URLs keep their first capture."""
+        url = normalize_url(url)
+        if url is None:
+            return
+        source = self._id(url)
+        if self._crawled[source]:
+            return
+        self._crawled[source] = 1
+        targets = {}
+        for target, text in links:
+            node = self._id(target)
+            targets[node] = None
+            if node != source and text:
+                self._anchor_targets.append(node)
+                self._anchor_texts.append(self._anchor_id(text))
+        self._targets.extend(targets)
+        self._page_sources.append(source)
+        self._page_counts.append(len(targets))
+
+    def build(self, homepages=None):
+        """Compile the CSR graph; depth is measured from ``homepages`` (default: every crawled ``/`` URL)."""
+        nodes = len(self.urls)
+        targets = np.frombuffer(self._targets, dtype=np.uint32)
+        page_sources = np.frombuffer(self._page_sources, dtype=np.uint32)
+        page_counts = np.frombuffer(self._page_counts, dtype=np.uint32).astype(np.int64)
+        page_starts = np.cumsum(page_counts) - page_counts
+
+        # Reorder the per-page edge groups by node id to get CSR rows
+        counts = np.zeros(nodes, dtype=np.int64)
+        counts[page_sources] = page_counts
+        indptr = np.zeros(nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        order = np.argsort(page_sources, kind="stable")
+        indices = targets[ranges(page_starts[order], page_counts[order])]
+
+        sources = np.repeat(np.arange(nodes, dtype=np.uint32), counts)
+        external = sources != indices
+        in_degree = np.bincount(indices[external], minlength=nodes)
+
+        crawled = np.frombuffer(self._crawled, dtype=np.uint8).astype(bool)
+        if homepages is None:
+            # Normalized site roots are exactly "scheme://host/"
+            roots = [node for node in np.flatnonzero(crawled).tolist()
+                     if self.urls[node].endswith("/") and self.urls[node].count("/") == 3]
+        else:
+            roots = [self._ids[url] for url in map(normalize_url, homepages) if url in self._ids]
+        depth = _bfs(indptr, indices, np.array(roots, dtype=np.int64)) if roots else np.full(nodes, -1, np.int32)
+        return LinkGraph(self, crawled, indptr, indices, in_degree, depth, np.array(roots, dtype=np.int64))
+
+
+def keyword_ids(urls, keyword="", keywords=None):
+    """Keyword id per normalized URL (-1 without one) and the keyword texts.
+
+    ``keywords`` (``{url: keyword}``) overrides ``keyword``; texts are
+    compared stripped and lowercased.
+    """
+    keyword = (keyword or "").strip().lower()
+    if not keywords:
+        return np.full(len(urls), 0 if keyword else -1, dtype=np.int64), [keyword]
+    keywords = {normalize_url(url) or url: text for url, text in keywords.items()}
+    ids = {}
+    url_keywords = np.full(len(urls), -1, dtype=np.int64)
+    for i, url in enumerate(urls):
+        text = (keywords.get(url, keyword) or "").strip().lower()
+        if text:
+            url_keywords[i] = ids.setdefault(text, len(ids))
+    return url_keywords, list(ids)
+
+
+def _bfs(indptr, indices, roots):
+    depth = np.full(len(indptr) - 1, -1, dtype=np.int32)
+    depth[roots] = 0
+    frontier = np.unique(roots)
+    level = 0
+    while len(frontier):
+        starts = indptr[frontier]
+        neighbours = indices[ranges(starts, indptr[frontier + 1] - starts)]
+        frontier = np.unique(neighbours[depth[neighbours] < 0]).astype(np.int64)
+        level += 1
+        depth[frontier] = level
+    return depth
+
+
+class LinkGraph:
+    __slots__ = ("urls", "anchors", "crawled", "indptr", "indices", "in_degree", "depth", "roots",
+                 "_ids", "_anchor_targets", "_anchor_texts")
+
+    def __init__(self, builder, crawled, indptr, indices, in_degree, depth, roots):
+        self.urls = builder.urls
+        self.anchors = builder.anchors
+        self._ids = builder._ids
+        self._anchor_targets = np.frombuffer(builder._anchor_targets, dtype=np.uint32)
+        self._anchor_texts = np.frombuffer(builder._anchor_texts, dtype=np.uint32)
+        self.crawled = crawled
+        self.indptr = indptr
+        self.indices = indices
+        self.in_degree = in_degree
+        self.depth = depth
+        self.roots = roots
+
+    def __len__(self):
+        return len(self.urls)
+
+    def keyword_anchors(self, keyword="", keywords=None):
+        """Inbound links from other pages whose anchor contains each node's target keyword."""
+        return self._keyword_anchors(*keyword_ids(self.urls, keyword, keywords))
+
+    def _keyword_anchors(self, node_keywords, keyword_texts):
+        counts = np.zeros(len(self.urls), dtype=np.int64)
+        targets = self._anchor_targets.astype(np.int64)
+        wanted = node_keywords[targets] >= 0
+        if not wanted.any():
+            return counts
+        targets = targets[wanted]
+        # Each distinct (anchor, keyword) combination is string-matched once
+        pairs, inverse = np.unique(
+            self._anchor_texts[wanted].astype(np.int64) * len(keyword_texts) + node_keywords[targets],
+            return_inverse=True,
+        )
+        matched = np.fromiter(
+            (keyword_texts[k] in self.anchors[a] for a, k in zip(*np.divmod(pairs, len(keyword_texts)))),
+            dtype=bool, count=len(pairs),
+        )
+        np.add.at(counts, targets[matched[inverse]], 1)
+        return counts
+
+    def metrics(self, keyword="", keywords=None):
+        """Yield ``(url, depth, in_degree, keyword_anchors)`` for every crawled page; depth is -1 when unreachable."""
+        anchors = self.keyword_anchors(keyword, keywords)
+        for node in np.flatnonzero(self.crawled):
+            yield self.urls[node], int(self.depth[node]), int(self.in_degree[node]), int(anchors[node])
+
+    def answers(self, keyword="", keywords=None):
+        """Criterion answers per crawled page as ``{normalized url: {criterion id: code}}``."""
+        node_keywords, keyword_texts = keyword_ids(self.urls, keyword, keywords)
+        anchors = self._keyword_anchors(node_keywords, keyword_texts)
+        roots = set(self.roots.tolist())
+        answers = {}
+        for node in np.flatnonzero(self.crawled).tolist():
+            page = {ORPHAN_CRITERION: YES if self.in_degree[node] or node in roots else NO}
+            if roots:
+                page[DEPTH_CRITERION] = YES if 0 <= self.depth[node] <= MAX_DEPTH else NO
+            if node_keywords[node] >= 0:
+                page[ANCHOR_CRITERION] = YES if anchors[node] else NO
+            answers[self.urls[node]] = page
+        return answers
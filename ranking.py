@@ -0,0 +1,97 @@
+"""Estimated search ranking for an Overall score.
+
+Rankings are looked up in a ``RankingTable``: ascending score thresholds
+and one more label than thresholds, so a score gets the label of the
+highest threshold it reaches (or the first label when it reaches none).
+Tables can be calibrated per vertical in a JSON file::
+
+    {"bands": [[9.5, "1-3"], [9.0, "4-6"], [8.0, "7-20"]], "default": "20+"}
+
+``SEO_GRADER_RANKING_CONFIG`` points the app and the bulk CLI at one.
+When a model fitted by ``calibration.py`` is present it is used instead.
+Estimators take the Overall score and, optionally, the bucket scores.
+"""
+import bisect
+import json
+import math
+import os
+
+import numpy as np
+
+CONFIG_ENV = "SEO_GRADER_RANKING_CONFIG"
+
+DEFAULT_BANDS = [
+    (9.5, "1-3"),
+    (9.0, "4-6"),
+    (8.5, "7-10"),
+    (8.0, "11-15"),
+    (7.5, "16-20"),
+    (7.0, "21-30"),
+    (6.5, "31-50"),
+    (6.0, "51-100"),
+]
+DEFAULT_LABEL = "100+"
+
+
+class RankingTable:
+    __slots__ = ("thresholds", "labels", "_threshold_list", "_label_list")
+
+    def __init__(self, bands=DEFAULT_BANDS, default=DEFAULT_LABEL):
+        """``bands`` are ``(minimum score, label)`` pairs in any order; ``default`` labels scores below them all."""
+        bands = sorted((float(score), label) for score, label in bands)
+        thresholds = [score for score, _label in bands]
+        if len(set(thresholds)) != len(thresholds):
+            raise ValueError("Ranking thresholds must be unique")
+        self._threshold_list = thresholds
+        self._label_list = [default, *(label for _score, label in bands)]
+        self.thresholds = np.array(thresholds, dtype=np.float64)
+        self.labels = np.array(self._label_list)
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config["bands"], config.get("default", DEFAULT_LABEL))
+
+    def estimate(self, overall_score, bucket_scores=None):
+        if math.isnan(overall_score):
+            # NaN reaches no threshold, as with the comparisons this table replaced
+            return self._label_list[0]
+        return self._label_list[bisect.bisect_right(self._threshold_list, overall_score)]
+
+    def band_indices(self, overall_scores):
+        """Index into ``labels`` for every score in an array."""
+        overall_scores = np.asarray(overall_scores, dtype=np.float64)
+        return np.where(np.isnan(overall_scores), 0, np.searchsorted(self.thresholds, overall_scores, side="right"))
+
+    def estimate_batch(self, overall_scores, bucket_scores=None):
+        """Ranking label for every score in an array."""
+        return self.labels[self.band_indices(overall_scores)]
+
+
+_DEFAULT_ESTIMATOR = []
+
+
+def default_estimator():
+    """The calibrated model if one has been fitted, else the configured or built-in table; loaded once."""
+    if not _DEFAULT_ESTIMATOR:
+        from calibration import CalibratedRanking, default_model_path
+
+        model_path = default_model_path()
+        config_path = os.environ.get(CONFIG_ENV)
+        if os.path.exists(model_path):
+            _DEFAULT_ESTIMATOR.append(CalibratedRanking.load(model_path))
+        elif config_path:
+            _DEFAULT_ESTIMATOR.append(RankingTable.from_json(config_path))
+        else:
+            _DEFAULT_ESTIMATOR.append(RankingTable())
+    return _DEFAULT_ESTIMATOR[0]
+
+
+def estimate_ranking(overall_score, bucket_scores=None, estimator=None):
+    return (estimator or default_estimator()).estimate(overall_score, bucket_scores)
+
+
+def estimate_rankings(overall_scores, bucket_scores=None, estimator=None):
+    """Rankings for an array of Overall scores; ``bucket_scores`` has one column per bucket."""
+    return (estimator or default_estimator()).estimate_batch(overall_scores, bucket_scores)
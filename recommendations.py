@@ -0,0 +1,285 @@
+"""Prompt construction, caching and batch generation for the GPT recommendation step."""
+import asyncio
+import hashlib
+import json
+import random
+import time
+
+from rubric import NA, NO, RUBRIC
+
+MODEL = "gpt-4o"
+# Bump whenever the prompt template or system message changes so cached answers are not reused
+PROMPT_VERSION = 2
+SYSTEM_PROMPT = "You are an SEO expert providing recommendations based on an audit."
+
+# Defaults for batch generation; tune to the account's rate limits
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RPM = 500
+DEFAULT_TPM = 30000
+MAX_RETRIES = 6
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+# Reserved per request for the completion until the real usage is known
+COMPLETION_TOKEN_ESTIMATE = 800
+# Upper bound on tokens spent listing failing criteria in the prompt
+DEFAULT_TOKEN_BUDGET = 600
+
+PROMPT_TEMPLATE = """An SEO audit found the page failing the criteria below, grouped by category and subcategory and listed in order of score impact (Overall points recoverable by fixing each are in brackets). Criteria not listed passed or don't apply.
+
+{results}
+
+Please provide specific, actionable recommendations for each failing criterion, prioritizing the highest-impact ones. Use the following format:
+
+### [Main Category]
+**[Subcategory]**
+- Action: [Specific recommendation]
+- Action: [Another specific recommendation]
+
+Repeat this structure for each category and subcategory that needs improvement."""
+
+# Changes to criteria or weights change the prompt, so they are part of every cache key
+RUBRIC_DIGEST = hashlib.sha256(
+    json.dumps([RUBRIC.buckets, RUBRIC.factors, RUBRIC.criteria, list(RUBRIC.weights)]).encode("utf-8")
+).hexdigest()
+
+
+def count_tokens(text):
+    """Number of ``MODEL`` tokens in ``text``; estimated when tiktoken is unavailable."""
+    encoding = _encoding()
+    if encoding is None:
+        # Roughly four characters per token for English prose
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+_ENCODING = []
+
+
+def _encoding():
+    if not _ENCODING:
+        try:
+            import tiktoken
+
+            _ENCODING.append(tiktoken.encoding_for_model(MODEL))
+        except Exception:
+            # Not installed, or the encoding file can't be downloaded
+            _ENCODING.append(None)
+    return _ENCODING[0]
+
+
+def score_losses(responses):
+    """Overall points lost to each failing criterion, as ``{criterion id: loss}``.
+
+    Fixing criterion ``c`` raises its factor score by ``weight / possible * 10``
+    (possible being the weight of the factor's applicable criteria), which is
+    averaged into the bucket and scaled by the bucket weight.
+    """
+    losses = {}
+    for b in range(len(RUBRIC.buckets)):
+        factors = RUBRIC.bucket_factors(b)
+        scale = 10 * RUBRIC.bucket_weights[b] / len(factors)
+        for f in factors:
+            criteria = RUBRIC.factor_criteria(f)
+            possible = sum(RUBRIC.weights[c] for c in criteria if responses[c] != NA)
+            for c in criteria:
+                if responses[c] == NO:
+                    losses[c] = RUBRIC.weights[c] / possible * scale
+    return losses
+
+
+def format_failures(responses, token_budget=DEFAULT_TOKEN_BUDGET):
+    """List failing criteria by descending score loss, grouped under their factor.
+
+    Factors are ordered by their largest loss. Criteria are added until
+    ``token_budget`` is reached; the rest are summarized in a closing line.
+    """
+    losses = score_losses(responses)
+    if not losses:
+        return "No failing criteria."
+    ranked = sorted(losses, key=losses.get, reverse=True)
+    groups = {}
+    for c in ranked:
+        groups.setdefault(RUBRIC.criterion_factor[c], []).append(c)
+
+    lines = []
+    used = 0
+    omitted = 0
+    for f, criteria in groups.items():
+        header = f"{RUBRIC.buckets[RUBRIC.factor_bucket[f]]} > {RUBRIC.factors[f]}"
+        header_tokens = count_tokens(header)
+        for c in criteria:
+            line = f"- {RUBRIC.criteria[c]} [{losses[c]:.2f}]"
+            cost = count_tokens(line) + (header_tokens if header else 0)
+            if used + cost > token_budget:
+                omitted += 1
+                continue
+            if header:
+                lines.append(header)
+                header = None
+            lines.append(line)
+            used += cost
+    if omitted:
+        lines.append(f"({omitted} lower-impact failing criteria omitted)")
+    return "\n".join(lines)
+
+
+def build_messages(responses, token_budget=DEFAULT_TOKEN_BUDGET):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": PROMPT_TEMPLATE.format(results=format_failures(responses, token_budget))},
+    ]
+
+
+def _starts_block(line):
+    line = line.strip()
+    return line.startswith("###") or (len(line) > 4 and line.startswith("**") and line.endswith("**"))
+
+
+def split_blocks(text):
+    """Split streamed markdown into finished ``###``/``**`` blocks and the unfinished rest.
+
+    A block is finished once the next block's heading line has fully arrived.
+    """
+    complete, newline, partial = text.rpartition("\n")
+    if not newline:
+        return [], text
+    blocks = []
+    current = []
+    for line in complete.split("\n"):
+        if current and _starts_block(line):
+            blocks.append("\n".join(current))
+            current = []
+        current.append(line)
+    return blocks, "\n".join(current) + "\n" + partial
+
+
+def prompt_tokens(messages):
+    return sum(count_tokens(message["content"]) for message in messages)
+
+
+def cache_key(responses, model=MODEL, prompt_version=PROMPT_VERSION, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Content hash of the normalized response codes, model and prompt version."""
+    payload = {
+        "responses": [int(code) for code in responses],
+        "model": model,
+        "prompt_version": prompt_version,
+        "token_budget": token_budget,
+        "rubric": RUBRIC_DIGEST,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at ``per_minute`` tokens a minute."""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        # Set by refunds so a waiting request doesn't sleep past them
+        self._refunded = asyncio.Event()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        # Waiters queue on the lock, so requests are admitted in arrival order
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                self._refunded.clear()
+                try:
+                    await asyncio.wait_for(self._refunded.wait(), (amount - self.tokens) / self.rate)
+                except asyncio.TimeoutError:
+                    pass
+                self._refill()
+            self.tokens -= amount
+
+    def adjust(self, amount):
+        """Return (positive) or charge (negative) tokens once actual usage is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+        if amount > 0:
+            self._refunded.set()
+
+
+def _retry_delay(error, attempt):
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass
+    # Full jitter keeps retrying workers from synchronizing
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _is_retryable(error):
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+async def _generate_one(client, responses, semaphore, requests, tokens, model, max_retries, cache, token_budget):
+    key = cache_key(responses, model, token_budget=token_budget) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    messages = build_messages(responses, token_budget)
+    estimate = prompt_tokens(messages) + COMPLETION_TOKEN_ESTIMATE
+    async with semaphore:
+        for attempt in range(max_retries + 1):
+            await requests.acquire()
+            await tokens.acquire(estimate)
+            try:
+                response = await client.chat.completions.create(model=model, messages=messages)
+            except Exception as e:
+                # Rejected requests don't consume tokens
+                tokens.adjust(estimate)
+                if attempt == max_retries or not _is_retryable(e):
+                    raise
+                await asyncio.sleep(_retry_delay(e, attempt))
+                continue
+            if response.usage is not None:
+                tokens.adjust(estimate - response.usage.total_tokens)
+            recommendations = response.choices[0].message.content
+            if cache is not None:
+                cache.set(key, recommendations)
+            return recommendations
+
+
+async def generate_recommendations_async(audits, client=None, model=MODEL, concurrency=DEFAULT_CONCURRENCY,
+                                         rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, max_retries=MAX_RETRIES, cache=None,
+                                         token_budget=DEFAULT_TOKEN_BUDGET):
+    """Generate recommendations for many response vectors concurrently.
+
+    Results come back in the order of ``audits``; an audit whose request
+    still fails after ``max_retries`` yields the exception instead of text.
+    """
+    if client is None:
+        from openai import AsyncOpenAI
+
+        # Retries are handled here so they share the rate limiters
+        client = AsyncOpenAI(max_retries=0)
+    semaphore = asyncio.Semaphore(concurrency)
+    requests, tokens = TokenBucket(rpm), TokenBucket(tpm)
+    return await asyncio.gather(
+        *(_generate_one(client, responses, semaphore, requests, tokens, model, max_retries, cache, token_budget)
+          for responses in audits),
+        return_exceptions=True,
+    )
+
+
+def generate_recommendations(audits, **kwargs):
+    """Synchronous wrapper around ``generate_recommendations_async``."""
+    return asyncio.run(generate_recommendations_async(audits, **kwargs))
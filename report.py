@@ -0,0 +1,231 @@
+"""Word reports of audit results.
+
+``report_blocks`` lays out one page's report as ``(style, text)``
+paragraphs. ``export_to_word`` renders them with python-docx for a single
+page; ``PortfolioWriter`` streams many pages straight into the OOXML
+package on disk so memory stays flat however many pages are written, and
+``export_reports_zip`` renders one document per page in a process pool.
+"""
+import csv
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from rubric import NA, RESPONSE_LABELS, RUBRIC
+
+TITLE = "SEO Audit Results"
+DOCUMENT_PART = "word/document.xml"
+PAGE_BREAK_XML = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+# Control characters other than tab/newline are not allowed in XML
+INVALID_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+REPORT_FILENAME = "seo_audit_results.docx"
+MANIFEST_NAME = "manifest.csv"
+SLUG_RE = re.compile(r"[^A-Za-z0-9]+")
+
+
+def report_blocks(responses, scores, recommendations, estimated_ranking, title=TITLE):
+    yield "Title", title
+
+    # Scores
+    yield "Heading 1", "Scores"
+    for bucket, score in scores.items():
+        yield None, f"{bucket}: {score:.2f}/10"
+
+    # Estimated Ranking
+    yield "Heading 1", "Estimated Ranking"
+    yield None, f"Based on the overall score of {scores['Overall']:.2f}/10, the page might rank in positions: {estimated_ranking}"
+
+    # Recommendations
+    yield "Heading 1", "Recommendations"
+
+    current_heading = None
+    for line in recommendations.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('###'):
+            # Main heading
+            yield "Heading 2", line.strip('# ')
+            current_heading = None
+        elif line.startswith('**') and line.endswith('**'):
+            # Subheading
+            yield "Heading 3", line.strip('*')
+            current_heading = line.strip('*')
+        elif line.startswith('-') or line.startswith('*'):
+            # Bullet point
+            yield "List Bullet", line.strip('- *')
+        elif line.startswith('1.') or line.startswith('2.') or line.startswith('3.'):
+            # Numbered list
+            yield "List Number", line
+        else:
+            # Regular paragraph
+            if current_heading:
+                yield None, f"{current_heading}: {line}"
+            else:
+                yield None, line
+
+    # Selected Criteria
+    yield "Heading 1", "Selected Criteria"
+    for b, bucket in enumerate(RUBRIC.buckets):
+        yield "Heading 2", f"{bucket} Factors"
+        for f in RUBRIC.bucket_factors(b):
+            yield "Heading 3", RUBRIC.factors[f]
+            for c in RUBRIC.factor_criteria(f):
+                if responses[c] != NA:
+                    yield None, f"{RUBRIC.criteria[c]}: {RESPONSE_LABELS[responses[c]]}"
+
+
+def export_to_word(responses, scores, recommendations, estimated_ranking, title=TITLE):
+    from docx import Document
+
+    doc = Document()
+    for style, text in report_blocks(responses, scores, recommendations, estimated_ranking, title):
+        doc.add_paragraph(text, style=style)
+
+    # Save the document to a BytesIO object
+    doc_bytes = io.BytesIO()
+    doc.save(doc_bytes)
+    doc_bytes.seek(0)
+
+    return doc_bytes
+
+
+_TEMPLATE = {}
+
+
+def _template():
+    """Parts of python-docx's default template, read once and reused for every portfolio.
+
+    Returns ``(parts, document_start, section_properties)`` where ``parts``
+    maps every part except the document body to its bytes.
+    """
+    if not _TEMPLATE:
+        import docx
+
+        path = os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+        with zipfile.ZipFile(path) as template:
+            parts = {name: template.read(name) for name in template.namelist() if name != DOCUMENT_PART}
+            document = template.read(DOCUMENT_PART).decode("utf-8")
+        _TEMPLATE["parts"] = parts
+        _TEMPLATE["start"] = document[:document.index("<w:body>") + len("<w:body>")]
+        _TEMPLATE["sect_pr"] = re.search(r"<w:sectPr.*</w:sectPr>", document, re.DOTALL).group(0)
+    return _TEMPLATE["parts"], _TEMPLATE["start"], _TEMPLATE["sect_pr"]
+
+
+def _paragraph_xml(style, text):
+    properties = f'<w:pPr><w:pStyle w:val="{style.replace(" ", "")}"/></w:pPr>' if style else ""
+    return f'<w:p>{properties}<w:r><w:t xml:space="preserve">{escape(INVALID_XML_RE.sub("", text))}</w:t></w:r></w:p>'
+
+
+class PortfolioWriter:
+    """Write a multi-page audit report incrementally to ``target`` (a path or binary file).
+
+    Template parts are copied first, then the document body is streamed
+    through a single compressed zip entry one page at a time::
+
+        with PortfolioWriter("portfolio.docx") as writer:
+            for url, responses, scores, recommendations, ranking in pages:
+                writer.add_page(url, responses, scores, recommendations, ranking)
+    """
+
+    def __init__(self, target):
+        parts, start, self._sect_pr = _template()
+        self._zip = zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED)
+        for name, data in parts.items():
+            self._zip.writestr(name, data)
+        self._body = self._zip.open(DOCUMENT_PART, "w", force_zip64=True)
+        self._body.write(start.encode("utf-8"))
+        self.pages = 0
+
+    def add_page(self, url, responses, scores, recommendations, estimated_ranking):
+        chunks = [PAGE_BREAK_XML] if self.pages else []
+        for style, text in report_blocks(responses, scores, recommendations, estimated_ranking, f"{TITLE}: {url}"):
+            chunks.append(_paragraph_xml(style, text))
+        self._body.write("".join(chunks).encode("utf-8"))
+        self.pages += 1
+
+    def close(self):
+        if self._zip is None:
+            return
+        self._body.write(f"{self._sect_pr}</w:body></w:document>".encode("utf-8"))
+        self._body.close()
+        self._zip.close()
+        self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_portfolio(pages, target):
+    """Stream ``(url, responses, scores, recommendations, estimated_ranking)`` pages into one report."""
+    with PortfolioWriter(target) as writer:
+        for page in pages:
+            writer.add_page(*page)
+        return writer.pages
+
+
+def _render_reports(pages):
+    """Worker: render ``export_to_word`` for a chunk of pages, titled with their URLs."""
+    return [export_to_word(*page[1:], title=f"{TITLE}: {page[0]}").getvalue() for page in pages]
+
+
+def _archive_name(url, used):
+    slug = SLUG_RE.sub("-", url.split("://", 1)[-1]).strip("-")[:100] or "page"
+    name = slug
+    n = 2
+    while name in used:
+        name = f"{slug}-{n}"
+        n += 1
+    used.add(name)
+    return f"{name}/{REPORT_FILENAME}"
+
+
+def export_reports_zip(pages, target, workers=None, chunk_size=8, progress=None):
+    """Render one report per ``(url, responses, scores, recommendations, estimated_ranking)`` page into a ZIP.
+
+    Documents are rendered in a process pool and written to ``target`` (a
+    path or binary file) as they finish. Names are assigned in input order,
+    so a URL gets the same path however the workers finish, and
+    ``manifest.csv`` maps every URL to its path. ``progress(done, total)`` is
+    called after each chunk; ``total`` is ``None`` when ``pages`` has no length.
+    """
+    workers = workers or os.cpu_count() or 1
+    total = len(pages) if hasattr(pages, "__len__") else None
+    pages = iter(pages)
+    used = set()
+    manifest = io.StringIO()
+    manifest_writer = csv.writer(manifest)
+    manifest_writer.writerow(["url", "path"])
+    done = 0
+
+    def write(futures):
+        nonlocal done
+        for future in futures:
+            for name, data in zip(pending.pop(future), future.result()):
+                # .docx files are already deflated; storing avoids compressing twice
+                archive.writestr(name, data, zipfile.ZIP_STORED)
+                done += 1
+            if progress:
+                progress(done, total)
+
+    with ProcessPoolExecutor(workers) as executor, zipfile.ZipFile(target, "w") as archive:
+        # Future -> archive names of its chunk
+        pending = {}
+        while chunk := list(islice(pages, chunk_size)):
+            names = [_archive_name(page[0], used) for page in chunk]
+            manifest_writer.writerows((page[0], name) for page, name in zip(chunk, names))
+            pending[executor.submit(_render_reports, chunk)] = names
+            if len(pending) >= workers * 2:
+                write(wait(pending, return_when=FIRST_COMPLETED).done)
+        while pending:
+            write(wait(pending, return_when=FIRST_COMPLETED).done)
+        archive.writestr(MANIFEST_NAME, manifest.getvalue(), zipfile.ZIP_DEFLATED)
+    return done
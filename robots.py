@@ -0,0 +1,209 @@
+"""robots.txt rules for the Indexability criterion.
+
+``RobotsTxt`` parses a robots.txt file into user-agent groups (RFC 9309);
+``rules_for`` compiles the group that applies to a crawler once. The
+compiled ``RobotsRules`` sorts plain prefixes into one hash table per
+prefix length and turns only ``*``/``$`` patterns into regexes, so a
+lookup is a few dictionary probes. The longest matching pattern (as
+written, trailing ``*`` included) wins and Allow wins a tie, as RFC 9309
+and Google's matcher do.
+
+``RobotsIndex`` holds the compiled rules of every host in a crawl and
+answers URLs in batches. ``x_robots_directives`` reads the X-Robots-Tag
+header so it can be checked alongside meta robots tags.
+"""
+import re
+from urllib.parse import quote, urlsplit
+
+from linkgraph import URL_RE
+from rubric import NO, RUBRIC, YES
+
+DEFAULT_AGENT = "googlebot"
+INDEXABILITY_CRITERION = RUBRIC.criterion_id(
+    "Indexability", "Page is indexable by search engines / isn't blocked by meta tags or robots.txt"
+)
+
+# Characters left as they are when percent-encoding patterns and paths
+SAFE_CHARS = "/*$?=&;:@%+,!~'()[]-._"
+ESCAPE_RE = re.compile(r"%[0-9a-fA-F]{2}")
+# X-Robots-Tag directives that take a value after a colon, unlike a user-agent prefix
+VALUE_DIRECTIVES = frozenset(("unavailable_after", "max-snippet", "max-image-preview", "max-video-preview"))
+X_ROBOTS_AGENT_RE = re.compile(r"\s*([\w-]+)\s*:\s*(.*)")
+
+
+def _encode(path):
+    """Percent-encode non-ASCII characters and uppercase escapes so patterns and paths compare alike."""
+    if path.isascii() and "%" not in path:
+        return path
+    return ESCAPE_RE.sub(lambda m: m.group(0).upper(), quote(path, safe=SAFE_CHARS))
+
+
+def _regex(pattern):
+    """Regex for a pattern: ``*`` matches anything and a final ``$`` anchors the end."""
+    anchored = pattern.endswith("$")
+    body = pattern[:-1] if anchored else pattern
+    return ".*".join(map(re.escape, body.split("*"))) + (r"\Z" if anchored else "")
+
+
+class RobotsRules:
+    """Compiled Allow/Disallow rules of one user-agent group."""
+    __slots__ = ("_prefixes", "_exact", "_patterns", "_any_pattern")
+
+    def __init__(self, rules):
+        prefixes = {}
+        self._exact = {}
+        patterns = {}
+        for allow, pattern in rules:
+            pattern = _encode(pattern)
+            if not pattern:
+                continue
+            # Rules rank by the length of the pattern as written
+            rank = (len(pattern), allow)
+            if not pattern.endswith("$"):
+                # A trailing * adds nothing to what a prefix matches (unless it would leave a literal $ last)
+                prefix = pattern if pattern.rstrip("*").endswith("$") else pattern.rstrip("*")
+                if "*" not in prefix:
+                    table = prefixes.setdefault(len(prefix), {})
+                    table[prefix] = max(table.get(prefix, rank), rank)
+                    continue
+            elif "*" not in pattern:
+                self._exact[pattern[:-1]] = max(self._exact.get(pattern[:-1], rank), rank)
+                continue
+            patterns[pattern] = patterns.get(pattern, False) or allow
+        # Prefix tables in order of the best rank they hold, so the probe can stop early
+        self._prefixes = sorted(((max(table.values())[0], length, table) for length, table in prefixes.items()),
+                                reverse=True, key=lambda entry: entry[:2])
+        ordered = sorted(patterns.items(), key=lambda item: (-len(item[0]), not item[1]))
+        self._patterns = [(len(pattern), allow, re.compile(_regex(pattern), re.DOTALL)) for pattern, allow in ordered]
+        # Most paths match no wildcard pattern; one alternation rules them all out at once
+        self._any_pattern = re.compile("|".join(f"(?:{_regex(pattern)})" for pattern, _allow in ordered),
+                                       re.DOTALL) if ordered else None
+
+    def allowed(self, path):
+        """Whether a path (with its query string) may be crawled."""
+        path = _encode(path or "/")
+        if path == "/robots.txt":
+            return True
+        # (pattern length, allow) of the best match; a longer pattern wins and Allow wins a tie
+        best = (-1, True)
+        for rank, length, table in self._prefixes:
+            if rank < best[0]:
+                break
+            found = table.get(path[:length])
+            if found is not None and found > best:
+                best = found
+        exact = self._exact.get(path)
+        if exact is not None and exact > best:
+            best = exact
+        if self._any_pattern is None or not self._any_pattern.match(path):
+            return best[1]
+        for length, allow, regex in self._patterns:
+            if (length, allow) < best:
+                break
+            if regex.match(path):
+                return allow
+        return best[1]
+
+
+ALLOW_ALL = RobotsRules(())
+
+
+class RobotsTxt:
+    """A parsed robots.txt file: ``(user agents, [(allow, pattern), ...])`` groups."""
+    __slots__ = ("groups", "_compiled")
+
+    def __init__(self, text):
+        self.groups = []
+        self._compiled = {}
+        agents, rules = None, None
+        # A byte order mark would otherwise hide the first user-agent line
+        for line in text.lstrip("\ufeff").splitlines():
+            key, separator, value = line.split("#", 1)[0].partition(":")
+            if not separator:
+                continue
+            key, value = key.strip().lower(), value.strip()
+            if key == "user-agent":
+                if agents is None or rules:
+                    agents, rules = [], []
+                    self.groups.append((agents, rules))
+                agents.append(value.split("/", 1)[0].strip().lower())
+            elif key in ("allow", "disallow") and agents is not None:
+                rules.append((key == "allow", value))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8-sig", errors="replace") as f:
+            return cls(f.read())
+
+    def rules_for(self, agent=DEFAULT_AGENT):
+        """Compiled rules of every group naming ``agent``, else of the ``*`` groups."""
+        agent = agent.lower()
+        if agent not in self._compiled:
+            rules = [rule for agents, group in self.groups if agent in agents for rule in group]
+            if not any(agent in agents for agents, _group in self.groups):
+                rules = [rule for agents, group in self.groups if "*" in agents for rule in group]
+            self._compiled[agent] = RobotsRules(rules) if rules else ALLOW_ALL
+        return self._compiled[agent]
+
+
+def _split(url):
+    """``(lowercased scheme://host, path and query)`` of an absolute URL, or None (also when it can't be parsed)."""
+    match = URL_RE.fullmatch(url) if url.isprintable() and " " not in url else None
+    if match is not None:
+        scheme, netloc, path, query = match.groups()
+    else:
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return None
+        if not parts.netloc:
+            return None
+        scheme, netloc, path, query = parts.scheme, parts.netloc, parts.path, parts.query
+    path = path or "/"
+    return f"{scheme.lower()}://{netloc.lower()}", f"{path}?{query}" if query else path
+
+
+class RobotsIndex:
+    """Compiled robots.txt rules per origin (``scheme://host``), with an optional default for other hosts."""
+
+    def __init__(self, agent=DEFAULT_AGENT):
+        self.agent = agent
+        self._origins = {}
+        self.default = None
+
+    def add(self, robots, origin=None):
+        """Use a ``RobotsTxt`` for ``origin``, or for every host without its own when ``origin`` is None."""
+        rules = robots.rules_for(self.agent)
+        if origin is None:
+            self.default = rules
+        else:
+            self._origins[origin.rstrip("/").lower()] = rules
+
+    def allowed_many(self, urls):
+        """True/False per URL, or None where no robots.txt covers its host or the URL can't be parsed."""
+        results = []
+        for url in urls:
+            parts = _split(url)
+            rules = None if parts is None else self._origins.get(parts[0], self.default)
+            results.append(None if rules is None else rules.allowed(parts[1]))
+        return results
+
+
+def x_robots_directives(value, agent=DEFAULT_AGENT):
+    """Lowercased X-Robots-Tag directive lists (one per header line) that apply to ``agent``."""
+    directives = []
+    for line in (value or "").lower().splitlines():
+        match = X_ROBOTS_AGENT_RE.match(line)
+        if match and match.group(1) not in VALUE_DIRECTIVES:
+            if match.group(1) == agent.lower():
+                directives.append(match.group(2))
+        elif line.strip():
+            directives.append(line.strip())
+    return directives
+
+
+def combine_indexability(html_answer, allowed):
+    """Indexability from the HTML/header answer and the robots.txt verdict (None when unknown)."""
+    if html_answer == NO or allowed is False:
+        return NO
+    return YES if allowed else html_answer
@@ -0,0 +1,136 @@
+"""Batch scoring of SEO audits with NumPy.
+
+Responses are encoded as int8 (Yes=1, No=0, N/A=-1) in an N x criteria
+matrix (columns in ``RUBRIC`` criterion order) and scored against a
+criterion x factor weight matrix compiled from the rubric. Results match
+``calculate_score`` averaged per bucket and weighted by ``bucket_weights``
+exactly (see tests/test_scoring.py).
+
+``ScoreState`` keeps one audit's scores up to date as individual answers
+change, touching only the changed criterion's factor and bucket.
+"""
+import numpy as np
+
+from rubric import NA, RUBRIC, YES
+
+
+def calculate_score(responses, factor, rubric=RUBRIC):
+    """One factor's 0-10 score, computed criterion by criterion.
+
+    Kept as the reference the batch and incremental scorers are tested against.
+    """
+    score = 0
+    max_score = 0
+    weights = rubric.weights
+    for c in rubric.factor_criteria(factor):
+        if responses[c] == YES:
+            score += weights[c]
+        if responses[c] != NA:
+            max_score += weights[c]
+    return score / max_score * 10 if max_score > 0 else 0
+
+
+class WeightMatrix:
+    __slots__ = ("rubric", "matrix")
+
+    def __init__(self, rubric=RUBRIC):
+        self.rubric = rubric
+        # Each criterion contributes its weight to exactly one factor column
+        self.matrix = np.zeros((len(rubric), len(rubric.factors)), dtype=np.float64)
+        self.matrix[np.arange(len(rubric)), np.asarray(rubric.criterion_factor)] = rubric.weights
+
+
+def score_batch(weights, responses):
+    """Score an N x criteria int8 response matrix.
+
+    Returns ``(factor_scores, scores)`` where ``factor_scores`` is N x factors
+    and ``scores`` maps each bucket and ``"Overall"`` to a length-N array.
+    """
+    responses = np.atleast_2d(np.asarray(responses, dtype=np.int8))
+    # Weights are small integers, so these products are exact regardless of summation order
+    earned = (responses == YES).astype(np.float64) @ weights.matrix
+    possible = (responses != NA).astype(np.float64) @ weights.matrix
+
+    factor_scores = np.zeros_like(earned)
+    np.divide(earned, possible, out=factor_scores, where=possible > 0)
+    factor_scores *= 10
+
+    # Accumulate left to right to reproduce Python's sum() bit for bit
+    scores = {}
+    overall = np.zeros(len(responses), dtype=np.float64)
+    rubric = weights.rubric
+    for b, bucket in enumerate(rubric.buckets):
+        factors = rubric.bucket_factors(b)
+        total = np.zeros(len(responses), dtype=np.float64)
+        for f in factors:
+            total += factor_scores[:, f]
+        scores[bucket] = total / len(factors)
+        overall += scores[bucket] * rubric.bucket_weights[b]
+    scores["Overall"] = overall
+    return factor_scores, scores
+
+
+class ScoreState:
+    """Incrementally maintained scores for one response vector.
+
+    Each factor's earned and possible weight is kept as an integer, so
+    changing one answer adjusts two counters and rescores one factor. Its
+    bucket is re-averaged from the cached factor scores in the original
+    left-to-right order and ``Overall`` from the bucket scores, which keeps
+    results identical to a full recompute.
+    """
+    __slots__ = ("rubric", "responses", "earned", "possible", "factor_scores", "bucket_scores", "overall")
+
+    def __init__(self, responses, rubric=RUBRIC):
+        self.rubric = rubric
+        self.responses = [int(code) for code in responses]
+        self.earned = [0] * len(rubric.factors)
+        self.possible = [0] * len(rubric.factors)
+        for c, code in enumerate(self.responses):
+            self._count(c, code, 1)
+        self.factor_scores = [self._factor_score(f) for f in range(len(rubric.factors))]
+        self.bucket_scores = [self._bucket_score(b) for b in range(len(rubric.buckets))]
+        self.overall = self._overall()
+
+    def _count(self, c, code, sign):
+        f = self.rubric.criterion_factor[c]
+        weight = self.rubric.weights[c]
+        if code == YES:
+            self.earned[f] += sign * weight
+        if code != NA:
+            self.possible[f] += sign * weight
+
+    def _factor_score(self, f):
+        possible = self.possible[f]
+        return self.earned[f] / possible * 10 if possible > 0 else 0
+
+    def _bucket_score(self, b):
+        factors = self.rubric.bucket_factors(b)
+        return sum(self.factor_scores[f] for f in factors) / len(factors)
+
+    def _overall(self):
+        return sum(score * self.rubric.bucket_weights[b] for b, score in enumerate(self.bucket_scores))
+
+    def set(self, c, code):
+        """Change criterion ``c``'s answer; returns whether anything changed."""
+        code = int(code)
+        if self.responses[c] == code:
+            return False
+        self._count(c, self.responses[c], -1)
+        self._count(c, code, 1)
+        self.responses[c] = code
+        f = self.rubric.criterion_factor[c]
+        self.factor_scores[f] = self._factor_score(f)
+        b = self.rubric.factor_bucket[f]
+        self.bucket_scores[b] = self._bucket_score(b)
+        self.overall = self._overall()
+        return True
+
+    def update(self, responses):
+        """Bring the state in line with a full response vector; returns the changed criterion ids."""
+        return [c for c, code in enumerate(responses) if self.set(c, code)]
+
+    def scores(self):
+        scores = dict(zip(self.rubric.buckets, self.bucket_scores))
+        scores["Overall"] = self.overall
+        return scores
@@ -0,0 +1,233 @@
+"""Sensitivity of scores and rankings to the rubric's weights.
+
+``weight_gradients`` gives every page's partial derivatives of Overall
+with respect to each bucket weight and each criterion weight.
+``sweep`` rescores a whole portfolio under alternate weight sets and
+reports which pages land in a different estimated ranking. Factor scores
+under the rubric's weights are computed once; a weight set rescores only
+the factors whose criterion weights it changes, and sweeping bucket
+weights alone costs one small matrix product per set. Usage::
+
+    python sensitivity.py --vary-bucket On-Page 0.4:0.7:50 -o crossings.csv
+
+The portfolio is the latest run of every URL in the history store.
+"""
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from history import HistoryStore, default_history_path
+from ranking import estimate_rankings
+from rubric import NA, RUBRIC, YES
+
+TOP_CRITERIA = 10
+
+
+def _criterion_matrix(criterion_weights, rubric=RUBRIC):
+    matrix = np.zeros((len(rubric), len(rubric.factors)), dtype=np.float64)
+    matrix[np.arange(len(rubric)), np.asarray(rubric.criterion_factor)] = criterion_weights
+    return matrix
+
+
+def _bucket_averaging(rubric=RUBRIC):
+    """Factors x buckets matrix averaging factor scores into bucket scores."""
+    averaging = np.zeros((len(rubric.factors), len(rubric.buckets)), dtype=np.float64)
+    for b in range(len(rubric.buckets)):
+        factors = rubric.bucket_factors(b)
+        averaging[list(factors), b] = 1 / len(factors)
+    return averaging
+
+
+class Portfolio:
+    """Response vectors prepared for repeated rescoring under different weights."""
+    __slots__ = ("rubric", "yes", "applicable", "averaging", "_base")
+
+    def __init__(self, responses, rubric=RUBRIC):
+        responses = np.atleast_2d(np.asarray(responses, dtype=np.int8))
+        self.rubric = rubric
+        self.yes = (responses == YES).astype(np.float64)
+        self.applicable = (responses != NA).astype(np.float64)
+        self.averaging = _bucket_averaging(rubric)
+        self._base = None
+
+    def __len__(self):
+        return len(self.yes)
+
+    def factor_terms(self):
+        """Earned weight, possible weight and factor score per page and factor under the rubric's weights."""
+        if self._base is None:
+            matrix = _criterion_matrix(self.rubric.weights, self.rubric)
+            earned, possible = self.yes @ matrix, self.applicable @ matrix
+            factor_scores = np.zeros_like(earned)
+            np.divide(earned, possible, out=factor_scores, where=possible > 0)
+            self._base = earned, possible, factor_scores * 10
+        return self._base
+
+    def bucket_scores(self, criterion_weights=None):
+        earned, possible, factor_scores = self.factor_terms()
+        buckets = factor_scores @ self.averaging
+        if criterion_weights is None:
+            return buckets
+        # Only the factors holding a reweighted criterion are rescored
+        delta = np.asarray(criterion_weights, dtype=np.float64) - np.asarray(self.rubric.weights)
+        changed = np.flatnonzero(delta)
+        if not len(changed):
+            return buckets
+        factors = np.unique(np.asarray(self.rubric.criterion_factor)[changed])
+        matrix = _criterion_matrix(delta, self.rubric)[np.ix_(changed, factors)]
+        new_earned = earned[:, factors] + self.yes[:, changed] @ matrix
+        new_possible = possible[:, factors] + self.applicable[:, changed] @ matrix
+        new_scores = np.zeros_like(new_earned)
+        np.divide(new_earned, new_possible, out=new_scores, where=new_possible > 0)
+        return buckets + (new_scores * 10 - factor_scores[:, factors]) @ self.averaging[factors]
+
+
+def weight_gradients(portfolio):
+    """Partial derivatives of Overall as ``(N x buckets, N x criteria)`` arrays.
+
+    Overall is linear in the bucket weights, so their derivatives are the
+    bucket scores. A criterion weight moves its factor score by
+    ``10 * (yes * possible - applicable * earned) / possible ** 2``.
+    """
+    rubric = portfolio.rubric
+    earned, possible, _factor_scores = portfolio.factor_terms()
+    bucket_gradient = portfolio.bucket_scores()
+
+    criterion_factor = np.asarray(rubric.criterion_factor)
+    earned, possible = earned[:, criterion_factor], possible[:, criterion_factor]
+    factor_gradient = np.zeros_like(earned)
+    np.divide(10 * (portfolio.yes * possible - portfolio.applicable * earned), possible ** 2,
+              out=factor_gradient, where=possible > 0)
+    # Each factor enters Overall as bucket weight / factors in the bucket
+    factor_scale = (portfolio.averaging @ np.asarray(rubric.bucket_weights))[criterion_factor]
+    return bucket_gradient, factor_gradient * factor_scale
+
+
+def sweep(portfolio, weight_sets, estimator=None):
+    """Rescore ``portfolio`` under each ``(bucket_weights, criterion_weights)`` set (None keeps the rubric's).
+
+    Returns ``(baseline, results)``: the baseline Overall and rankings, and
+    per weight set a dict with the new ``overall`` array, the indices of
+    pages whose ranking ``changed`` and their new ``rankings``.
+    """
+    rubric = portfolio.rubric
+    bucket_cache = {}
+
+    def score(bucket_weights, criterion_weights):
+        key = None if criterion_weights is None else tuple(np.asarray(criterion_weights, dtype=np.float64).tolist())
+        if key not in bucket_cache:
+            bucket_cache[key] = portfolio.bucket_scores(criterion_weights)
+        buckets = bucket_cache[key]
+        weights = np.asarray(rubric.bucket_weights if bucket_weights is None else bucket_weights, dtype=np.float64)
+        overall = buckets @ weights
+        return overall, estimate_rankings(overall, buckets, estimator)
+
+    base_overall, base_rankings = score(None, None)
+    results = []
+    for bucket_weights, criterion_weights in weight_sets:
+        overall, rankings = score(bucket_weights, criterion_weights)
+        changed = np.flatnonzero(rankings != base_rankings)
+        results.append({
+            "bucket_weights": bucket_weights,
+            "criterion_weights": criterion_weights,
+            "overall": overall,
+            "changed": changed,
+            "rankings": rankings[changed],
+        })
+    return (base_overall, base_rankings), results
+
+
+def vary_bucket_weight(bucket, values, rubric=RUBRIC):
+    """Weight sets giving ``bucket`` each of ``values``, the other buckets rescaled to keep the total."""
+    b = rubric.buckets.index(bucket)
+    base = np.asarray(rubric.bucket_weights, dtype=np.float64)
+    others = base.sum() - base[b]
+    sets = []
+    for value in values:
+        weights = base * (base.sum() - value) / others
+        weights[b] = value
+        sets.append((weights, None))
+    return sets
+
+
+def vary_criterion_weight(factor, criterion, values, rubric=RUBRIC):
+    c = rubric.criterion_id(factor, criterion)
+    sets = []
+    for value in values:
+        weights = np.asarray(rubric.weights, dtype=np.float64)
+        weights[c] = value
+        sets.append((None, weights))
+    return sets
+
+
+def bucket_weight_grid(step, rubric=RUBRIC):
+    """Every bucket weight set on a ``step`` grid that sums to 1."""
+    steps = round(1 / step)
+    grid = np.stack(np.meshgrid(*[np.arange(steps + 1)] * (len(rubric.buckets) - 1), indexing="ij"), -1)
+    grid = grid.reshape(-1, len(rubric.buckets) - 1)
+    grid = grid[grid.sum(axis=1) <= steps]
+    return [(np.append(row, steps - row.sum()) / steps, None) for row in grid]
+
+
+def _linspace(spec):
+    start, stop, count = spec.split(":")
+    return np.linspace(float(start), float(stop), int(count))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weight sensitivity of Overall scores and rankings.")
+    parser.add_argument("--history", default=None, help="History database holding the portfolio (default location)")
+    sweeps = parser.add_mutually_exclusive_group()
+    sweeps.add_argument("--vary-bucket", nargs=2, metavar=("BUCKET", "START:STOP:COUNT"),
+                        help="Sweep one bucket weight, rescaling the others")
+    sweeps.add_argument("--vary-criterion", nargs=3, metavar=("FACTOR", "CRITERION", "START:STOP:COUNT"),
+                        help="Sweep one criterion weight")
+    sweeps.add_argument("--bucket-grid", type=float, metavar="STEP", help="Sweep every bucket weight set on a grid")
+    parser.add_argument("-o", "--output", default="-", help="CSV of pages that change ranking (default: stdout)")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.history or default_history_path())
+    urls, responses = store.latest_responses()
+    store.close()
+    portfolio = Portfolio(responses)
+
+    bucket_gradient, criterion_gradient = weight_gradients(portfolio)
+    print(f"Portfolio: {len(portfolio)} pages", file=sys.stderr)
+    for b, bucket in enumerate(RUBRIC.buckets):
+        print(f"dOverall/d({bucket} weight): mean {bucket_gradient[:, b].mean():.3f}", file=sys.stderr)
+    impact = np.abs(criterion_gradient).mean(axis=0)
+    for c in np.argsort(-impact, kind="stable")[:TOP_CRITERIA]:
+        print(f"dOverall/d(weight of {RUBRIC.factors[RUBRIC.criterion_factor[c]]}: {RUBRIC.criteria[c]}): "
+              f"mean abs {impact[c]:.4f}", file=sys.stderr)
+
+    if args.vary_bucket:
+        weight_sets = vary_bucket_weight(args.vary_bucket[0], _linspace(args.vary_bucket[1]))
+    elif args.vary_criterion:
+        weight_sets = vary_criterion_weight(*args.vary_criterion[:2], _linspace(args.vary_criterion[2]))
+    elif args.bucket_grid:
+        weight_sets = bucket_weight_grid(args.bucket_grid)
+    else:
+        return
+    (base_overall, base_rankings), results = sweep(portfolio, weight_sets)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["weight_set", *(f"{bucket} weight" for bucket in RUBRIC.buckets), "url",
+                         "Overall", "new_overall", "ranking", "new_ranking"])
+        for k, result in enumerate(results):
+            bucket_weights = RUBRIC.bucket_weights if result["bucket_weights"] is None else result["bucket_weights"]
+            for i, ranking in zip(result["changed"], result["rankings"]):
+                writer.writerow([k, *(f"{weight:.4f}" for weight in bucket_weights), urls[i],
+                                 f"{base_overall[i]:.2f}", f"{result['overall'][i]:.2f}", base_rankings[i], ranking])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    for k, result in enumerate(results):
+        print(f"Weight set {k}: {len(result['changed'])} pages change ranking", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
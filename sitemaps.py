@@ -0,0 +1,250 @@
+"""Sitemap membership for the "Sitemap Inclusion" criterion.
+
+``iter_sitemap_urls`` streams ``<loc>`` entries out of local sitemap files
+(plain or gzipped) with ``iterparse``, clearing every element once read so
+memory stays flat however large the file. Sitemap indexes are followed to
+their child sitemaps, which are looked up by file name next to the index.
+
+``SitemapIndex`` keeps a 64-bit fingerprint of each normalized URL rather
+than the URL itself: an open-addressing hash table (at most half full, so
+16-32 bytes per URL and constant-time lookups) up to ``BLOOM_THRESHOLD``
+URLs and a Bloom filter (with ``BLOOM_ERROR_RATE`` false positives) beyond
+that, which is filled in streamed batches. Both are built and queried a
+NumPy batch at a time.
+"""
+import gzip
+import hashlib
+import math
+import os
+import sys
+import xml.etree.ElementTree as ET
+from array import array
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from linkgraph import normalize_url
+from rubric import NO, RUBRIC, YES
+
+BLOOM_THRESHOLD = 10_000_000
+BLOOM_ERROR_RATE = 0.001
+# Fingerprints hashed and added per step
+FINGERPRINT_BATCH = 1_000_000
+
+SITEMAP_CRITERION = RUBRIC.criterion_id("Sitemap Inclusion", "Page is included in sitemap.xml file")
+
+
+def _open(path):
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    return gzip.open(path, "rb") if magic == b"\x1f\x8b" else open(path, "rb")
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap_urls(path, _visited=None, _quiet=False):
+    """Yield every page URL listed in a sitemap or, recursively, a sitemap index."""
+    visited = set() if _visited is None else _visited
+    path = os.path.abspath(path)
+    if path in visited:
+        return
+    visited.add(path)
+    children = []
+    with _open(path) as f:
+        root = None
+        loc = None
+        for event, element in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                root = element
+            if event == "start":
+                continue
+            name = _local_name(element.tag)
+            if name == "loc":
+                loc = (element.text or "").strip()
+            elif name in ("url", "sitemap"):
+                if loc:
+                    if name == "url":
+                        yield loc
+                    else:
+                        children.append(loc)
+                loc = None
+                # Drop the finished entry and everything parsed before it
+                root.clear()
+    directory = os.path.dirname(path)
+    for loc in children:
+        try:
+            name = os.path.basename(urlsplit(loc).path)
+        except ValueError:
+            name = ""
+        child = os.path.join(directory, name)
+        if name and os.path.isfile(child):
+            yield from iter_sitemap_urls(child, visited, _quiet)
+        elif not _quiet:
+            print(f"Sitemap {loc} listed in {path} not found at {child}", file=sys.stderr)
+
+
+def fingerprint(url):
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _fingerprint_batches(paths, batch=FINGERPRINT_BATCH):
+    """Yield uint64 arrays fingerprinting every normalizable URL listed in the sitemaps."""
+    fingerprints = array("Q")
+    visited = set()
+    for path in paths:
+        for url in iter_sitemap_urls(path, visited):
+            url = normalize_url(url)
+            if url is not None:
+                fingerprints.append(fingerprint(url))
+                if len(fingerprints) >= batch:
+                    yield np.frombuffer(fingerprints, dtype=np.uint64)
+                    fingerprints = array("Q")
+    if fingerprints:
+        yield np.frombuffer(fingerprints, dtype=np.uint64)
+
+
+class BloomFilter:
+    """Bit array with ``hashes`` probes per fingerprint, derived by double hashing."""
+    __slots__ = ("bits", "size", "hashes")
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / max(capacity, 1) * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, fingerprints):
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        low = fingerprints & np.uint64(0xFFFFFFFF)
+        high = (fingerprints >> np.uint64(32)) | np.uint64(1)
+        probes = np.arange(self.hashes, dtype=np.uint64)
+        return (low[:, np.newaxis] + probes * high[:, np.newaxis]) % np.uint64(self.size)
+
+    def add_many(self, fingerprints):
+        positions = self._positions(fingerprints).ravel()
+        masks = np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
+
+    def contains_many(self, fingerprints):
+        positions = self._positions(fingerprints)
+        bits = self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return (bits & 1).astype(bool).all(axis=1)
+
+
+class FingerprintTable:
+    """Hash set of uint64 fingerprints with linear probing in a power-of-two array (0 marks an empty slot)."""
+    __slots__ = ("slots", "mask", "has_zero")
+
+    def __init__(self, fingerprints):
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        self.has_zero = bool((fingerprints == 0).any())
+        size = 1 << max(4, (2 * len(fingerprints)).bit_length())
+        self.mask = np.uint64(size - 1)
+        self.slots = np.zeros(size, dtype=np.uint64)
+        for start in range(0, len(fingerprints), FINGERPRINT_BATCH):
+            self._add(fingerprints[start:start + FINGERPRINT_BATCH])
+
+    def _add(self, keys):
+        keys = keys[keys != 0]
+        slots = keys & self.mask
+        # Each round, every key still probing claims its slot if it's free (the
+        # first of several keys wanting the same one wins) or moves to the next
+        while len(keys):
+            free = np.flatnonzero(self.slots[slots] == 0)
+            _, first = np.unique(slots[free], return_index=True)
+            self.slots[slots[free[first]]] = keys[free[first]]
+            probing = self.slots[slots] != keys
+            keys, slots = keys[probing], (slots[probing] + np.uint64(1)) & self.mask
+
+    def contains_many(self, fingerprints):
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        found = fingerprints == 0 if self.has_zero else np.zeros(len(fingerprints), dtype=bool)
+        active = np.flatnonzero(fingerprints != 0)
+        slots = fingerprints[active] & self.mask
+        while len(active):
+            current = self.slots[slots]
+            found[active[current == fingerprints[active]]] = True
+            # A probe ends at its key or at an empty slot
+            probing = (current != 0) & (current != fingerprints[active])
+            active, slots = active[probing], (slots[probing] + np.uint64(1)) & self.mask
+        return found
+
+
+class SitemapIndex:
+    """Membership of normalized URLs in a set of sitemaps; build with ``from_files``."""
+    __slots__ = ("_table", "_bloom", "count")
+
+    def __init__(self, fingerprints, bloom_threshold=BLOOM_THRESHOLD, error_rate=BLOOM_ERROR_RATE):
+        fingerprints = np.unique(np.asarray(fingerprints, dtype=np.uint64))
+        self.count = len(fingerprints)
+        self._table = None
+        self._bloom = None
+        if self.count > bloom_threshold:
+            self._bloom = BloomFilter(self.count, error_rate)
+            for start in range(0, self.count, FINGERPRINT_BATCH):
+                self._bloom.add_many(fingerprints[start:start + FINGERPRINT_BATCH])
+        else:
+            self._table = FingerprintTable(fingerprints)
+
+    @classmethod
+    def from_files(cls, paths, bloom_threshold=BLOOM_THRESHOLD, error_rate=BLOOM_ERROR_RATE):
+        """Index the URLs listed in sitemap files (or indexes).
+
+        Fingerprints are buffered up to ``bloom_threshold`` URLs. Past that
+        the files are counted once more to size the Bloom filter, and the
+        buffer and the remaining URLs are added to it batch by batch; the
+        count then includes URLs listed more than once.
+        """
+        paths = list(paths)
+        batches = _fingerprint_batches(paths)
+        buffered = []
+        listed = 0
+        for batch in batches:
+            buffered.append(batch)
+            listed += len(batch)
+            if listed > bloom_threshold:
+                break
+        else:
+            return cls(np.concatenate(buffered) if buffered else (), bloom_threshold, error_rate)
+
+        visited = set()
+        capacity = sum(1 for path in paths for _url in iter_sitemap_urls(path, visited, _quiet=True))
+        index = cls((), bloom_threshold, error_rate)
+        index._table = None
+        index._bloom = BloomFilter(capacity, error_rate)
+        index._bloom.add_many(np.concatenate(buffered))
+        del buffered
+        for batch in batches:
+            index._bloom.add_many(batch)
+            listed += len(batch)
+        index.count = listed
+        return index
+
+    def __len__(self):
+        return self.count
+
+    def _contains_normalized(self, urls):
+        fingerprints = np.fromiter(map(fingerprint, urls), dtype=np.uint64, count=len(urls))
+        if self._bloom is not None:
+            return self._bloom.contains_many(fingerprints)
+        return self._table.contains_many(fingerprints)
+
+    def contains_many(self, urls):
+        """Membership of each URL; URLs that can't be normalized are never members."""
+        normalized = [normalize_url(url) for url in urls]
+        found = np.zeros(len(normalized), dtype=bool)
+        valid = [i for i, url in enumerate(normalized) if url is not None]
+        found[valid] = self._contains_normalized([normalized[i] for i in valid])
+        return found
+
+    def __contains__(self, url):
+        return bool(self.contains_many([url])[0])
+
+    def answers(self, urls):
+        """Sitemap criterion answers as ``{normalized url: {criterion id: code}}`` for absolute URLs."""
+        normalized = [url for url in map(normalize_url, urls) if url is not None]
+        return {
+            url: {SITEMAP_CRITERION: YES if found else NO}
+            for url, found in zip(normalized, self._contains_normalized(normalized))
+        }
@@ -0,0 +1,109 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+``StubChatServer`` answers ``POST /v1/chat/completions`` from a background
+thread. Queued replies (``fail``) are served first, in order; every other
+request gets a completion echoing its user message, after ``delay(body)``
+seconds. Each request's arrival time and body are kept in ``requests`` and
+the most requests ever in flight at once in ``max_in_flight``.
+
+Run it on its own to point ``bulk.py --recommendations`` at it::
+
+    python tests/stub_server.py 8765
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python bulk.py ...
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+USAGE_TOKENS = 15
+
+
+class StubChatServer:
+    def __init__(self, port=0, delay=None):
+        self.delay = delay
+        self.requests = []
+        self.max_in_flight = 0
+        self._replies = []
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def fail(self, status, times=1, retry_after=None):
+        """Answer the next ``times`` requests with an error ``status`` (and a Retry-After header)."""
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        with self._lock:
+            self._replies.extend([(status, headers)] * times)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append((time.monotonic(), body))
+                    reply = stub._replies.pop(0) if stub._replies else None
+                    stub._in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub._in_flight)
+                try:
+                    if reply is not None:
+                        status, headers = reply
+                        self._send(status, {"error": {"message": f"stub error {status}", "type": "stub"}}, headers)
+                        return
+                    if stub.delay is not None:
+                        time.sleep(stub.delay(body))
+                    content = body["messages"][-1]["content"]
+                    self._send(200, {
+                        "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                     "finish_reason": "stop"}],
+                        "usage": {"prompt_tokens": USAGE_TOKENS - 5, "completion_tokens": 5,
+                                  "total_tokens": USAGE_TOKENS},
+                    })
+                finally:
+                    with stub._lock:
+                        stub._in_flight -= 1
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    server = StubChatServer(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Serving chat completions at {server.base_url}", file=sys.stderr)
+    server._server.serve_forever()
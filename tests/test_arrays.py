@@ -0,0 +1,9 @@
+import numpy as np
+
+from arrays import ranges
+
+
+def test_ranges():
+    starts, counts = np.array([5, 0, 10]), np.array([2, 0, 3])
+    assert ranges(starts, counts).tolist() == [5, 6, 10, 11, 12]
+    assert ranges(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)).tolist() == []
@@ -0,0 +1,33 @@
+from auditor import audit_html
+from rubric import NO, RUBRIC, YES
+
+CANONICAL = RUBRIC.criterion_id("Canonical Tag", "Canonical tag contains self-reference")
+HREFLANG = RUBRIC.criterion_id(
+    "Hreflang Tag",
+    "Hreflang tag (optional) is correct, targets the right locations, and references other translated page equivalents",
+)
+
+
+def page(canonical, alternates):
+    links = "".join(f'<link rel="alternate" hreflang="{code}" href="{href}">' for code, href in alternates)
+    return f'<html><head><link rel="canonical" href="{canonical}">{links}</head><body><h1>Hi</h1></body></html>'
+
+
+def test_self_canonical_and_hreflang():
+    answers = audit_html(page("/shoes", [("en", "/shoes"), ("de", "/de/shoes")]), url="https://example.com/shoes")
+    assert answers[CANONICAL] == YES
+    assert answers[HREFLANG] == YES
+
+
+def test_malformed_hrefs_do_not_match():
+    html = page("http://[bad", [("en", "https://example.com/shoes"), ("de", "http://[bad/de")])
+    for url in ("https://example.com/shoes", None):
+        answers = audit_html(html, url=url)
+        assert answers.get(CANONICAL) == (NO if url else None)
+        assert answers[HREFLANG] == NO
+
+
+def test_malformed_page_url_leaves_url_criteria_unanswered():
+    answers = audit_html(page("/", []), url="http://[x")
+    assert answers[CANONICAL] == NO
+    assert RUBRIC.criterion_id("HTTPS", "Page is served over HTTPS") not in answers
@@ -0,0 +1,9 @@
+from bulk import audit_chunk
+
+
+def test_failing_record_is_skipped(capsys):
+    records = [("https://a.com/", "<h1>A</h1>"), ("https://b.com/", None), ("https://c.com/", "<h1>C</h1>")]
+    rows, pages = audit_chunk(records, site=("links", "minhash", "canonicals"))
+    assert [row[0] for row in rows] == ["https://a.com/", "https://c.com/"]
+    assert [page["url"] for page in pages] == ["https://a.com/", "https://c.com/"]
+    assert "https://b.com/" in capsys.readouterr().err
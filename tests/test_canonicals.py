@@ -0,0 +1,42 @@
+import itertools
+
+from auditor import extract_signals
+from canonicals import CanonicalGraphBuilder, page_canonicals
+
+
+def build(pages):
+    builder = CanonicalGraphBuilder()
+    for url, canonicals in pages:
+        builder.add_page(url, canonicals)
+    return builder.build()
+
+
+def test_chain_collapses_to_its_end():
+    clusters = build([("https://ex.com/c", ["https://ex.com/b"]), ("https://ex.com/b", ["https://ex.com/a"]),
+                      ("https://ex.com/a", ["https://ex.com/a"])])
+    assert clusters.representatives() == {url: "https://ex.com/a" for url in ("https://ex.com/a", "https://ex.com/b",
+                                                                             "https://ex.com/c")}
+    assert clusters.counts()["chain"] == 1
+
+
+def test_loop_representative_is_smallest_url_in_any_crawl_order():
+    links = {"a": "b", "b": "c", "c": "a", "d": "b"}
+    for order in itertools.permutations(links):
+        clusters = build([(f"https://ex.com/{page}", [f"https://ex.com/{links[page]}"]) for page in order])
+        assert {row[2] for row in clusters.rows()} == {"https://ex.com/a"}
+        # Search engines ignore looping canonicals, so nothing is merged
+        assert all(url == representative for url, representative in clusters.representatives().items())
+
+
+def test_conflicting_and_invalid_pages_stay_apart():
+    clusters = build([("https://ex.com/a", ["https://ex.com/x", "https://ex.com/y"]), ("https://ex.com/b", [None]),
+                      ("https://ex.com/x", ["https://ex.com/x"])])
+    assert clusters.representatives() == {"https://ex.com/a": "https://ex.com/a", "https://ex.com/b": "https://ex.com/b",
+                                          "https://ex.com/x": "https://ex.com/x"}
+
+
+def test_unparsable_canonical_is_invalid():
+    signals = extract_signals('<link rel="canonical" href="http://[bad">')
+    assert page_canonicals(signals, "https://ex.com/a") == [None]
+    clusters = build([("https://ex.com/a", page_canonicals(signals, "https://ex.com/a"))])
+    assert clusters.counts()["invalid"] == 1
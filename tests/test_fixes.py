@@ -0,0 +1,39 @@
+import itertools
+
+import numpy as np
+
+from fixes import TOLERANCE, fix_plan
+from rubric import NA, NO, RUBRIC, YES
+from scoring import WeightMatrix, score_batch
+
+WEIGHTS = WeightMatrix()
+
+
+def brute_force(responses, target, efforts):
+    """Least effort over every subset of failing criteria reaching ``target``, or -1."""
+    failing = np.flatnonzero(responses == NO)
+    subsets = [subset for size in range(len(failing) + 1) for subset in itertools.combinations(failing, size)]
+    fixed = np.repeat(responses[np.newaxis], len(subsets), axis=0)
+    for row, subset in enumerate(subsets):
+        fixed[row, list(subset)] = YES
+    overall = score_batch(WEIGHTS, fixed)[1]["Overall"]
+    costs = [int(efforts[list(subset)].sum()) for subset in subsets]
+    return min((cost for cost, score in zip(costs, overall) if score >= target - TOLERANCE), default=-1)
+
+
+def test_fix_plan_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        responses = rng.choice(np.array([YES, NA], dtype=np.int8), len(RUBRIC), p=[0.85, 0.15])
+        responses[rng.choice(len(RUBRIC), size=int(rng.integers(1, 10)), replace=False)] = NO
+        efforts = rng.integers(1, 5, len(RUBRIC))
+        overall = float(score_batch(WEIGHTS, responses)[1]["Overall"][0])
+        for target in (overall - 0.1, overall + rng.uniform(0, 10 - overall), 10.0, 10.5):
+            criteria, effort, new_overall = fix_plan(responses, target, efforts)
+            assert effort == brute_force(responses, target, efforts)
+            if effort >= 0:
+                assert int(efforts[criteria].sum()) == effort
+                assert new_overall >= target - TOLERANCE
+            else:
+                # Unreachable: the plan fixes every failing criterion
+                assert criteria == np.flatnonzero(responses == NO).tolist()
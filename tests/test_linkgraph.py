@@ -0,0 +1,20 @@
+from auditor import extract_signals
+from bulk import audit_chunk
+from linkgraph import normalize_url, page_links
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.COM#top") == "https://example.com/"
+    assert normalize_url("https://example.com/a?b=1") == "https://example.com/a?b=1"
+    assert normalize_url("mailto:someone@example.com") is None
+    assert normalize_url("http://[bad") is None
+
+
+def test_malformed_links_are_skipped():
+    html = ('<base href="http://[bad/"><a href="http://[bad">Bad</a><a href="/shoes">Shoes</a>'
+            '<a href="https://other.com/">Other</a>')
+    signals = extract_signals(html, links=True)
+    assert page_links(signals, "https://example.com/") == [("https://example.com/shoes", "shoes")]
+    assert page_links(signals, "http://[x") == []
+    rows, pages = audit_chunk([("https://example.com/", html)], site=("links",))
+    assert len(rows) == 1 and pages[0]["links"] == [("https://example.com/shoes", "shoes")]
@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+
+from ranking import DEFAULT_BANDS, RankingTable
+
+
+def baseline_ranking(overall_score):
+    """The app's original if-chain."""
+    if overall_score >= 9.5:
+        return "1-3"
+    elif overall_score >= 9.0:
+        return "4-6"
+    elif overall_score >= 8.5:
+        return "7-10"
+    elif overall_score >= 8.0:
+        return "11-15"
+    elif overall_score >= 7.5:
+        return "16-20"
+    elif overall_score >= 7.0:
+        return "21-30"
+    elif overall_score >= 6.5:
+        return "31-50"
+    elif overall_score >= 6.0:
+        return "51-100"
+    else:
+        return "100+"
+
+
+def test_default_table_matches_baseline():
+    rng = np.random.default_rng(0)
+    thresholds = [score for score, _label in DEFAULT_BANDS]
+    scores = np.concatenate([
+        rng.uniform(-1, 11, 5000),
+        thresholds,
+        np.nextafter(thresholds, -math.inf),
+        np.nextafter(thresholds, math.inf),
+        [0.0, 10.0, math.inf, -math.inf, math.nan],
+    ])
+    table = RankingTable()
+    expected = [baseline_ranking(score) for score in scores.tolist()]
+    assert [table.estimate(score) for score in scores.tolist()] == expected
+    assert table.estimate_batch(scores).tolist() == expected
+
+
+def test_bands_in_any_order():
+    table = RankingTable([(8.0, "top"), (5.0, "middle")], default="bottom")
+    assert table.estimate_batch([9.0, 8.0, 7.9, 5.0, 4.9]).tolist() == ["top", "top", "middle", "middle", "bottom"]
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+
+import recommendations
+from recommendations import COMPLETION_TOKEN_ESTIMATE, TokenBucket, build_messages, generate_recommendations, prompt_tokens
+from rubric import NO, RUBRIC, YES
+from stub_server import StubChatServer
+
+openai = pytest.importorskip("openai")
+
+
+def audits(count):
+    """Response vectors failing a different criterion each, so every prompt differs."""
+    return [[NO if c == i else YES for c in range(len(RUBRIC))] for i in range(count)]
+
+
+def prompt(responses):
+    return build_messages(responses)[-1]["content"]
+
+
+def generate(server, batch, **kwargs):
+    client = openai.AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+    return generate_recommendations(batch, client=client, **kwargs)
+
+
+@pytest.fixture
+def server():
+    with StubChatServer() as stub:
+        yield stub
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(recommendations, "BACKOFF_BASE", 0.01)
+
+
+def test_results_follow_audit_order(server):
+    batch = audits(8)
+    # Earlier audits are answered last
+    order = {prompt(responses): i for i, responses in enumerate(batch)}
+    server.delay = lambda body: 0.02 * (len(batch) - order[body["messages"][-1]["content"]])
+    results = generate(server, batch, concurrency=8)
+    assert results == [prompt(responses) for responses in batch]
+    assert server.requests[0][1]["model"] == recommendations.MODEL
+
+
+def test_server_errors_and_rate_limits_are_retried(server):
+    server.fail(500)
+    server.fail(429, retry_after=0)
+    server.fail(503)
+    batch = audits(1)
+    assert generate(server, batch) == [prompt(batch[0])]
+    assert len(server.requests) == 4
+
+
+def test_retry_after_is_honoured(server):
+    server.fail(429, retry_after=0.3)
+    batch = audits(1)
+    assert generate(server, batch) == [prompt(batch[0])]
+    (first, _body), (second, _body) = server.requests
+    assert second - first >= 0.3
+
+
+def test_gives_up_after_max_retries(server):
+    server.fail(503, times=3)
+    result, = generate(server, audits(1), max_retries=2)
+    assert isinstance(result, openai.InternalServerError)
+    assert len(server.requests) == 3
+
+
+def test_client_errors_are_not_retried(server):
+    server.fail(400)
+    batch = audits(2)
+    results = generate(server, batch, concurrency=1)
+    assert isinstance(results[0], openai.BadRequestError)
+    assert results[1] == prompt(batch[1])
+    assert len(server.requests) == 2
+
+
+def test_concurrency_limit(server):
+    server.delay = lambda body: 0.05
+    generate(server, audits(6), concurrency=2)
+    assert server.max_in_flight == 2
+
+
+def test_token_limit_admits_one_request_and_refunds_unused_tokens(server):
+    batch = audits(4)
+    server.delay = lambda body: 0.05
+    # Room for one request's estimate at a time; without refunds the rest would wait most of a minute
+    tpm = max(prompt_tokens(build_messages(responses)) for responses in batch) + COMPLETION_TOKEN_ESTIMATE
+    started = time.monotonic()
+    results = generate(server, batch, concurrency=4, tpm=tpm)
+    assert results == [prompt(responses) for responses in batch]
+    assert server.max_in_flight == 1
+    assert time.monotonic() - started < 10
+
+
+def test_request_bucket_refills_at_its_rate():
+    async def drain(bucket, count):
+        for _ in range(count):
+            await bucket.acquire()
+
+    bucket = TokenBucket(600)
+    started = time.monotonic()
+    # The first 600 are the initial burst; three more take 3 / (600 / 60) seconds
+    asyncio.run(drain(bucket, 603))
+    assert 0.25 <= time.monotonic() - started < 1.5
@@ -0,0 +1,86 @@
+import pytest
+
+from robots import RobotsIndex, RobotsRules, RobotsTxt
+
+
+def allowed(rules, path):
+    return RobotsRules([(kind == "allow", pattern) for kind, pattern in rules]).allowed(path)
+
+
+def test_byte_order_mark_is_ignored(tmp_path):
+    text = "\ufeffUser-agent: *\nDisallow: /private\n"
+    path = tmp_path / "robots.txt"
+    path.write_bytes(text.encode("utf-8"))
+    for robots in (RobotsTxt.from_file(str(path)), RobotsTxt(text)):
+        assert robots.groups == [(["*"], [(False, "/private")])]
+        assert not robots.rules_for().allowed("/private/x")
+
+
+@pytest.mark.parametrize("rules, path, expected", [
+    # RFC 9309 2.2.2: the most specific (longest) match wins
+    ([("allow", "/example/page/"), ("disallow", "/example/page/disallowed.gif")], "/example/page/disallowed.gif", False),
+    ([("allow", "/example/page/"), ("disallow", "/example/page/disallowed.gif")], "/example/page/index.html", True),
+    ([("allow", "/p"), ("disallow", "/")], "/page", True),
+    ([("allow", "/page"), ("disallow", "/*.html")], "/page.html", False),
+    ([("allow", "/page"), ("disallow", "/*.ph")], "/page.php5", True),
+    # Equivalent rules: Allow wins
+    ([("allow", "/folder"), ("disallow", "/folder")], "/folder/page", True),
+    ([("allow", "/$"), ("disallow", "/")], "/", True),
+    ([("allow", "/$"), ("disallow", "/")], "/page.htm", False),
+    # A trailing * still counts towards the rule's length
+    ([("disallow", "/foo*"), ("allow", "/foo")], "/foobar", False),
+    ([("allow", "/shop"), ("disallow", "/shop*")], "/shop/cart", False),
+    ([("allow", "/shop*"), ("disallow", "/shop")], "/shop/cart", True),
+    ([("disallow", "/fish*")], "/fish", False),
+    ([("disallow", "/fish*")], "/fishheads/yummy.html", False),
+    ([("disallow", "/fish*")], "/Fish.asp", True),
+    # * matches any sequence, $ anchors the end
+    ([("disallow", "/*.php$")], "/filename.php", False),
+    ([("disallow", "/*.php$")], "/folder/filename.php", False),
+    ([("disallow", "/*.php$")], "/filename.php?parameters", True),
+    ([("disallow", "/*.php$")], "/filename.php/", True),
+    ([("disallow", "/fish*.php")], "/fishheads/catfish.php?parameters", False),
+    ([("disallow", "/fish*.php")], "/Fish.PHP", True),
+    ([("disallow", "/*")], "/anything", False),
+    ([("disallow", "/a$b")], "/a$b/c", False),
+    # RFC 9309 2.2.2 percent-encoding examples
+    ([("disallow", "/foo/bar/ツ")], "/foo/bar/%E3%83%84", False),
+    ([("disallow", "/foo/bar/%E3%83%84")], "/foo/bar/ツ", False),
+    ([("disallow", "/foo/bar/%e3%83%84")], "/foo/bar/%E3%83%84", False),
+    ([("disallow", "/foo/bar/%62%61%7A")], "/foo/bar/%62%61%7A", False),
+    ([("disallow", "/foo/bar/%62%61%7A")], "/foo/bar/baz", True),
+    ([("disallow", "/foo/bar?baz=quz")], "/foo/bar?baz=quz", False),
+    # robots.txt itself is always allowed; an empty Disallow allows everything
+    ([("disallow", "/")], "/robots.txt", True),
+    ([("disallow", "")], "/anything", True),
+])
+def test_rfc_matching(rules, path, expected):
+    assert allowed(rules, path) is expected
+
+
+def test_groups_and_agents():
+    robots = RobotsTxt(
+        "User-agent: *\n"
+        "Disallow: /private  # comment\n"
+        "\n"
+        "User-agent: Googlebot/2.1\n"
+        "User-agent: bingbot\n"
+        "Disallow: /nogoogle\n"
+        "Sitemap: https://example.com/sitemap.xml\n"
+        "User-agent: googlebot\n"
+        "Allow: /nogoogle/ok\n"
+    )
+    google = robots.rules_for("Googlebot")
+    assert google.allowed("/private")
+    assert not google.allowed("/nogoogle/x")
+    assert google.allowed("/nogoogle/ok/1")
+    assert not robots.rules_for("otherbot").allowed("/private/x")
+
+
+def test_index_by_origin():
+    index = RobotsIndex()
+    index.add(RobotsTxt("User-agent: *\nDisallow: /private/\n"), "https://Example.com/")
+    assert index.allowed_many(["https://example.com/private/a", "https://example.com/a", "https://other.com/private/a",
+                               "relative.html", "http://[x"]) == [False, True, None, None, None]
+    index.add(RobotsTxt("User-agent: *\nDisallow: /\n"))
+    assert index.allowed_many(["http://[x/private", "https://other.com/a"]) == [None, False]
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from rubric import NA, NO, RESPONSE_LABELS, RUBRIC, YES, bucket_weights, seo_factors
+from scoring import ScoreState, WeightMatrix, calculate_score, score_batch
+
+WEIGHTS = WeightMatrix()
+
+
+def baseline_factor_score(inputs):
+    """The app's original per-factor loop over ``{criterion: {"response": label, "weight": weight}}``."""
+    score = 0
+    max_score = 0
+    for criterion, data in inputs.items():
+        if data["response"] == "Yes":
+            score += data["weight"]
+        if data["response"] != "N/A":
+            max_score += data["weight"]
+    return score / max_score * 10 if max_score > 0 else 0
+
+
+def baseline_inputs(responses):
+    """Response codes laid out as the original app's nested ``inputs`` dict."""
+    inputs = {}
+    c = 0
+    for bucket, factors in seo_factors.items():
+        inputs[bucket] = {}
+        for factor, data in factors.items():
+            inputs[bucket][factor] = {}
+            for criterion, weight, _help in data["criteria"]:
+                inputs[bucket][factor][criterion] = {"response": RESPONSE_LABELS[int(responses[c])], "weight": weight}
+                c += 1
+    return inputs
+
+
+def baseline_scores(responses):
+    """Bucket and Overall scores exactly as the original app computed them."""
+    inputs = baseline_inputs(responses)
+    scores = {}
+    for bucket, factors in seo_factors.items():
+        bucket_score = sum(baseline_factor_score(inputs[bucket][factor]) for factor in factors)
+        scores[bucket] = bucket_score / len(factors)
+    scores["Overall"] = sum(score * bucket_weights[bucket] for bucket, score in scores.items())
+    return scores
+
+
+def random_audits(count, seed=0):
+    """Random response vectors; some have every criterion of a few factors N/A."""
+    rng = np.random.default_rng(seed)
+    audits = rng.choice(np.array([YES, NO, NA], dtype=np.int8), size=(count, len(RUBRIC)), p=[0.5, 0.35, 0.15])
+    for audit in audits[::3]:
+        for f in rng.choice(len(RUBRIC.factors), size=3, replace=False):
+            audit[list(RUBRIC.factor_criteria(f))] = NA
+    audits[0] = NA
+    audits[1] = YES
+    audits[2] = NO
+    return audits
+
+
+@pytest.fixture(scope="module")
+def audits():
+    return random_audits(600)
+
+
+def test_calculate_score_matches_baseline(audits):
+    for responses in audits[:100]:
+        inputs = baseline_inputs(responses)
+        for f, factor in enumerate(RUBRIC.factors):
+            bucket = RUBRIC.buckets[RUBRIC.factor_bucket[f]]
+            assert calculate_score(responses, f) == baseline_factor_score(inputs[bucket][factor])
+
+
+def test_batch_factor_scores_match_calculate_score(audits):
+    factor_scores, _scores = score_batch(WEIGHTS, audits)
+    expected = [[calculate_score(responses, f) for f in range(len(RUBRIC.factors))] for responses in audits]
+    assert factor_scores.tolist() == expected
+
+
+def test_batch_scores_match_baseline_bit_for_bit(audits):
+    _factor_scores, scores = score_batch(WEIGHTS, audits)
+    for i, responses in enumerate(audits):
+        expected = baseline_scores(responses)
+        assert {name: float(values[i]) for name, values in scores.items()} == expected
+    # A single vector scores the same as its row in a batch
+    _factor_scores, single = score_batch(WEIGHTS, audits[5])
+    assert {name: float(values[0]) for name, values in single.items()} == baseline_scores(audits[5])
+
+
+def test_score_state_matches_baseline_through_flips(audits):
+    rng = np.random.default_rng(1)
+    state = ScoreState(audits[0])
+    assert state.scores() == baseline_scores(audits[0])
+    responses = audits[0].copy()
+    for _ in range(2000):
+        c = int(rng.integers(len(RUBRIC)))
+        previous = responses[c]
+        responses[c] = rng.choice([code for code in (YES, NO, NA) if code != previous])
+        assert state.set(c, responses[c])
+        assert state.scores() == baseline_scores(responses)
+        if rng.random() < 0.3:
+            # Flip straight back; the scores must return exactly
+            responses[c] = previous
+            state.set(c, previous)
+            assert state.scores() == baseline_scores(responses)
+    assert not state.set(0, responses[0])
+
+
+def test_score_state_update_to_other_audits(audits):
+    state = ScoreState(audits[0])
+    for previous, responses in zip(audits[:199], audits[1:200]):
+        assert state.update(responses) == np.flatnonzero(responses != previous).tolist()
+        assert state.scores() == baseline_scores(responses)
+        assert state.factor_scores == [calculate_score(responses, f) for f in range(len(RUBRIC.factors))]
@@ -0,0 +1,38 @@
+import gzip
+from functools import partial
+
+import pytest
+
+import sitemaps
+from sitemaps import SitemapIndex
+
+
+def write_sitemap(path, urls, compress=False):
+    body = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+    data = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{body}</urlset>'.encode("utf-8")
+    path.write_bytes(gzip.compress(data) if compress else data)
+
+
+@pytest.mark.parametrize("bloom_threshold", [10_000_000, 50, 0])
+def test_membership_exact_and_bloom(tmp_path, monkeypatch, bloom_threshold):
+    # Small batches so the Bloom filter is filled across several of them
+    monkeypatch.setattr(sitemaps, "_fingerprint_batches", partial(sitemaps._fingerprint_batches, batch=7))
+    urls = [f"https://example.com/p{i}" for i in range(200)]
+    write_sitemap(tmp_path / "a.xml.gz", urls[:120], compress=True)
+    write_sitemap(tmp_path / "b.xml", urls[100:] + ["not a url"])
+    index = SitemapIndex.from_files([tmp_path / "a.xml.gz", tmp_path / "b.xml"], bloom_threshold)
+    assert index.contains_many(urls + ["HTTPS://EXAMPLE.COM/p5#top"]).all()
+    assert not index.contains_many(["https://example.com/missing", "relative"]).any()
+    assert len(index) == (200 if bloom_threshold > 200 else 220)
+
+
+def test_empty_index():
+    assert list(SitemapIndex(()).contains_many(["https://example.com/"])) == [False]
+
+
+def test_unparsable_urls_are_never_members(tmp_path):
+    write_sitemap(tmp_path / "a.xml", ["https://example.com/", "http://[bad"])
+    index = SitemapIndex.from_files([tmp_path / "a.xml"])
+    assert len(index) == 1
+    assert list(index.contains_many(["http://[x", "https://example.com/"])) == [False, True]
+    assert list(index.answers(["http://[x", "https://example.com/"])) == ["https://example.com/"]
@@ -0,0 +1,58 @@
+"""Monte Carlo score distributions for audits answered with less than full confidence.
+
+Each answered criterion carries a confidence: the probability that the
+given answer is right. Scenarios flip Yes/No answers with the remaining
+probability (N/A answers are kept as they are), are scored in one batch
+with ``score_batch`` and summarized as score percentiles and the
+probability of each estimated ranking.
+"""
+import numpy as np
+
+from ranking import estimate_rankings
+from rubric import NA, RUBRIC, YES
+from scoring import WeightMatrix, score_batch
+
+DEFAULT_SAMPLES = 10_000
+PERCENTILES = (5, 25, 50, 75, 95)
+
+WEIGHTS = WeightMatrix()
+
+
+def simulate(responses, confidence, samples=DEFAULT_SAMPLES, weights=WEIGHTS, rng=None):
+    """Score ``samples`` scenarios drawn around ``responses``.
+
+    ``confidence`` holds one probability per criterion (1.0 = certain).
+    Returns ``score_batch`` output for the samples x criteria scenario matrix.
+    """
+    rng = np.random.default_rng(rng)
+    responses = np.asarray(responses, dtype=np.int8)
+    confidence = np.clip(np.asarray(confidence, dtype=np.float64), 0, 1)
+    yes_probability = np.where(responses == YES, confidence, 1 - confidence)
+
+    # Only criteria that can change are drawn; the rest are broadcast from the answers
+    uncertain = np.flatnonzero((responses != NA) & (confidence < 1))
+    scenarios = np.repeat(responses[np.newaxis], samples, axis=0)
+    if len(uncertain):
+        draws = rng.random((samples, len(uncertain)), dtype=np.float32) < yes_probability[uncertain]
+        scenarios[:, uncertain] = draws
+    return score_batch(weights, scenarios)
+
+
+def summarize(factor_scores, scores, estimator=None, percentiles=PERCENTILES):
+    """Percentiles, mean and spread per score plus ranking probabilities, most likely first."""
+    summary = {}
+    for name, values in scores.items():
+        stats = dict(zip((f"p{p}" for p in percentiles), np.percentile(values, percentiles).tolist()))
+        stats["mean"] = float(values.mean())
+        stats["std"] = float(values.std())
+        summary[name] = stats
+    bucket_scores = np.column_stack([scores[bucket] for bucket in RUBRIC.buckets])
+    labels, counts = np.unique(estimate_rankings(scores["Overall"], bucket_scores, estimator), return_counts=True)
+    order = np.argsort(-counts, kind="stable")
+    rankings = {str(labels[i]): float(counts[i] / len(scores["Overall"])) for i in order}
+    return summary, rankings
+
+
+def score_distribution(responses, confidence, samples=DEFAULT_SAMPLES, estimator=None, rng=None):
+    """Simulate and summarize one page; returns ``(score summary, ranking probabilities)``."""
+    return summarize(*simulate(responses, confidence, samples, rng=rng), estimator=estimator)